@@ -0,0 +1,107 @@
+import os
+import sys
+
+# The shared puzzle core lives in lab3/sliding_puzzle.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lab3"))
+from sliding_puzzle import apply_move, is_solvable, move_table, pack, slide
+
+# (move, new blank position) pairs for every blank position on the 3x3 board
+moves = move_table(3)
+
+inverse = {'U': 'D', 'D': 'U', 'L': 'R', 'R': 'L'}
+
+# Expand one whole layer of a frontier. `seen` maps a packed state to
+# (parent state, move from the parent, blank position, depth). Returns the next
+# layer and the shallowest state also seen by the other search, if any.
+def expand(frontier, seen, other):
+    next_frontier = []
+    meet, best = None, None
+    for code in frontier:
+        _, _, pos, depth = seen[code]
+        for move, new_pos in moves[pos]:
+            new_code = slide(code, pos, new_pos)
+            if new_code in seen:
+                continue
+            seen[new_code] = (code, move, new_pos, depth + 1)
+            next_frontier.append(new_code)
+            if new_code in other:
+                total = depth + 1 + other[new_code][3]
+                if best is None or total < best:
+                    meet, best = new_code, total
+    return next_frontier, meet
+
+# Moves from the start to `meet`, then from `meet` back along the goal search
+def join(meet, forward, backward):
+    path = []
+    code = meet
+    while forward[code][0] is not None:
+        parent, move, _, _ = forward[code]
+        path.append(move)
+        code = parent
+    path.reverse()
+    code = meet
+    while backward[code][0] is not None:
+        parent, move, _, _ = backward[code]
+        path.append(inverse[move])
+        code = parent
+    return path
+
+# Breadth-first search grown from both ends, always expanding the smaller
+# frontier, until the two meet. Returns an optimal list of moves. If `stats` is
+# a dict, stats["expanded"] is set to the number of nodes expanded.
+def bidirectional_bfs(start, goal, stats=None):
+    if stats is not None:
+        stats["expanded"] = 0
+    if not is_solvable(start, goal):
+        return None
+    start_code, goal_code = pack(start), pack(goal)
+    if start_code == goal_code:
+        return []
+
+    forward = {start_code: (None, None, start.index(0), 0)}
+    backward = {goal_code: (None, None, goal.index(0), 0)}
+    forward_frontier, backward_frontier = [start_code], [goal_code]
+
+    while forward_frontier and backward_frontier:
+        if stats is not None:
+            stats["expanded"] += min(len(forward_frontier), len(backward_frontier))
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meet = expand(forward_frontier, forward, backward)
+        else:
+            backward_frontier, meet = expand(backward_frontier, backward, forward)
+        if meet is not None:
+            return join(meet, forward, backward)
+    return None
+
+# Print 3x3 matrix
+def print_matrix(state):
+    for i in range(0, 9, 3):
+        print(state[i:i+3])
+    print()
+
+if __name__ == "__main__":
+    print("Enter initial state (3x3 matrix, use 0 for blank):")
+    initial = []
+    m=0
+    for _ in range(3):
+        row = list(map(int, input().split()))
+        initial.extend(row)
+
+    start = tuple(initial)
+    goal  = (1,2,3,4,5,6,7,8,0)
+
+    print("\n--- Using Bidirectional BFS ---")
+    solution = bidirectional_bfs(start, goal)
+    if not is_solvable(start, goal):
+        print("This state is unsolvable.")
+    else:
+        state = start
+        pos = state.index(0)
+        print("Initial State:")
+        print_matrix(state)
+        for move in solution:
+            state, pos = apply_move(state, move, pos)
+            print(f"Move: {move}")
+            print_matrix(state)
+            m+=1
+    print("moves =",m)
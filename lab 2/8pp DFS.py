@@ -1,40 +1,41 @@
+import os
+import sys
 from collections import deque
 
-moves = {
-    'U': -3, 'D': 3, 'L': -1, 'R': 1
-}
+# The shared puzzle core lives in lab3/sliding_puzzle.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lab3"))
+from sliding_puzzle import apply_move, is_solvable, move_table, pack, slide
 
-def valid_move(pos, move):
-    if move == 'U' and pos < 3: return False
-    if move == 'D' and pos > 5: return False
-    if move == 'L' and pos % 3 == 0: return False
-    if move == 'R' and pos % 3 == 2: return False
-    return True
+# (move, new blank position) pairs for every blank position on the 3x3 board
+moves = move_table(3)
 
-def apply_move(state, move, pos):
-    new_state = list(state)
-    new_pos = pos + moves[move]
-    new_state[pos], new_state[new_pos] = new_state[new_pos], new_state[pos]
-    return tuple(new_state), new_pos
-
-def dfs(start, goal, depth_limit=100):
-    stack = [(start, start.index(0), [])]
+# If `stats` is a dict, stats["expanded"] is set to the number of nodes expanded
+def dfs(start, goal, depth_limit=100, stats=None):
+    # Unsolvable inputs would otherwise exhaust their whole parity class
+    if not is_solvable(start, goal):
+        if stats is not None:
+            stats["expanded"] = 0
+        return None
+    goal_code = pack(goal)
+    stack = [(pack(start), start.index(0), [])]
     visited = set()
 
     while stack:
-        state, pos, path = stack.pop()
+        code, pos, path = stack.pop()
 
-        if state == goal:
+        if code == goal_code:
+            if stats is not None:
+                stats["expanded"] = len(visited)
             return path
 
-        if tuple(state) in visited or len(path) >= depth_limit:
+        if code in visited or len(path) >= depth_limit:
             continue
-        visited.add(tuple(state))
+        visited.add(code)
 
-        for move in moves:
-            if valid_move(pos, move):
-                new_state, new_pos = apply_move(state, move, pos)
-                stack.append((new_state, new_pos, path + [move]))
+        for move, new_pos in moves[pos]:
+            stack.append((slide(code, pos, new_pos), new_pos, path + [move]))
+    if stats is not None:
+        stats["expanded"] = len(visited)
     return None
 
 def print_matrix(state):
@@ -42,28 +43,31 @@ def print_matrix(state):
         print(state[i:i+3])
     print()
 
-print("Enter initial state (3x3 matrix, use 0 for blank):")
-initial = []
-m=0
-for _ in range(3):
-    row = list(map(int, input().split()))
-    initial.extend(row)
+if __name__ == "__main__":
+    print("Enter initial state (3x3 matrix, use 0 for blank):")
+    initial = []
+    m=0
+    for _ in range(3):
+        row = list(map(int, input().split()))
+        initial.extend(row)
 
-start = tuple(initial)
-goal  = (1,2,3,4,5,6,7,8,0)
+    start = tuple(initial)
+    goal  = (1,2,3,4,5,6,7,8,0)
 
-solution = dfs(start, goal)
+    solution = dfs(start, goal)
 
-if solution is None:
-    print("No solution found within depth limit.")
-else:
-    print("\nSolution Path (as matrices):\n")
-    state = start
-    pos = state.index(0)
-    print_matrix(state)  # initial state
-    for move in solution:
-        state, pos = apply_move(state, move, pos)
-        print(f"Move: {move}")
-        print_matrix(state)
-        m+=1
-print("moves =",m)
+    if not is_solvable(start, goal):
+        print("This state is unsolvable.")
+    elif solution is None:
+        print("No solution found within depth limit.")
+    else:
+        print("\nSolution Path (as matrices):\n")
+        state = start
+        pos = state.index(0)
+        print_matrix(state)  # initial state
+        for move in solution:
+            state, pos = apply_move(state, move, pos)
+            print(f"Move: {move}")
+            print_matrix(state)
+            m+=1
+    print("moves =",m)
@@ -1,43 +1,80 @@
+import os
+import sys
 from collections import deque
 
-moves = {
-    'U': -3, 'D': 3, 'L': -1, 'R': 1
-}
+# The shared puzzle core lives in lab3/sliding_puzzle.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lab3"))
+from sliding_puzzle import apply_move, is_solvable, move_table, pack, slide
 
-def valid_move(pos, move):
-    if move == 'U' and pos < 3: return False
-    if move == 'D' and pos > 5: return False
-    if move == 'L' and pos % 3 == 0: return False
-    if move == 'R' and pos % 3 == 2: return False
-    return True
+# (move, new blank position) pairs for every blank position on the 3x3 board
+moves = move_table(3)
 
-def apply_move(state, move, pos):
-    new_state = list(state)
-    new_pos = pos + moves[move]
-    new_state[pos], new_state[new_pos] = new_state[new_pos], new_state[pos]
-    return tuple(new_state), new_pos
+inverse = {'U': 'D', 'D': 'U', 'L': 'R', 'R': 'L'}
 
-def dls(state, pos, goal, limit, path, visited):
-    if state == goal:
-        return path
-    if limit <= 0:
-        return None
+# Depth-limited search with an explicit stack. The current line of play is kept
+# in preallocated per-depth slots (packed state, blank position, next move to
+# try, move taken), so no path or state is copied per node. The move that undoes
+# the previous one is never tried.
+#
+# `table` maps a packed state to (iteration << 6) | depth for the shallowest
+# depth it has been reached at, and is kept across iterations: a state reached
+# deeper than before is pruned because its shallower copy is searched with more
+# depth to spare, and a repeat at the same depth within one iteration is pruned
+# as already searched.
+def dls(start_code, pos, goal_code, limit, table, iteration, stats=None):
+    if start_code == goal_code:
+        return []
+    result = None
+    expanded = 1  # the root
+    codes = [start_code] + [0] * limit
+    blanks = [pos] + [0] * limit
+    next_choice = [0] * (limit + 1)
+    path = [None] * limit
+    table[start_code] = iteration << 6
+    depth = 0
 
-    visited.add(state)
+    while depth >= 0:
+        options = moves[blanks[depth]]
+        i = next_choice[depth]
+        if depth == limit or i == len(options):
+            depth -= 1  # backtrack
+            continue
+        next_choice[depth] = i + 1
+        move, new_pos = options[i]
+        if depth > 0 and move == inverse[path[depth - 1]]:
+            continue
 
-    for move in moves:
-        if valid_move(pos, move):
-            new_state, new_pos = apply_move(state, move, pos)
-            if new_state not in visited:
-                result = dls(new_state, new_pos, goal, limit - 1, path + [move], visited)
-                if result is not None:
-                    return result
-    return None
+        code = slide(codes[depth], blanks[depth], new_pos)
+        g = depth + 1
+        seen = table.get(code)
+        if seen is not None and ((seen & 63) < g or seen == (iteration << 6) | g):
+            continue
+        table[code] = (iteration << 6) | g
 
-def ids(start, goal, max_depth=50):
+        path[depth] = move
+        if code == goal_code:
+            result = path[:g]
+            break
+        expanded += 1
+        depth = g
+        codes[depth] = code
+        blanks[depth] = new_pos
+        next_choice[depth] = 0
+    if stats is not None:
+        stats["expanded"] = stats.get("expanded", 0) + expanded
+    return result
+
+# If `stats` is a dict, stats["expanded"] is set to the number of nodes
+# expanded over all iterations
+def ids(start, goal, max_depth=50, stats=None):
+    if stats is not None:
+        stats["expanded"] = 0
+    if not is_solvable(start, goal):
+        return None
+    start_code, goal_code = pack(start), pack(goal)
+    table = {}  # shared by all iterations
     for depth in range(max_depth):
-        visited = set()
-        result = dls(start, start.index(0), goal, depth, [], visited)
+        result = dls(start_code, start.index(0), goal_code, depth, table, depth, stats)
         if result is not None:
             return result
     return None
@@ -48,28 +85,31 @@ def print_matrix(state):
         print(state[i:i+3])
     print()
 
-print("Enter initial state (3x3 matrix, use 0 for blank):")
-initial = []
-m=0
-for _ in range(3):
-    row = list(map(int, input().split()))
-    initial.extend(row)
+if __name__ == "__main__":
+    print("Enter initial state (3x3 matrix, use 0 for blank):")
+    initial = []
+    m=0
+    for _ in range(3):
+        row = list(map(int, input().split()))
+        initial.extend(row)
 
-start = tuple(initial)
-goal  = (1,2,3,4,5,6,7,8,0)
+    start = tuple(initial)
+    goal  = (1,2,3,4,5,6,7,8,0)
 
-print("\n--- Using IDS ---")
-solution_ids = ids(start, goal)
-if solution_ids is None:
-    print("No solution found (IDS within depth limit).")
-else:
-    state = start
-    pos = state.index(0)
-    print("Initial State:")
-    print_matrix(state)
-    for move in solution_ids:
-        state, pos = apply_move(state, move, pos)
-        print(f"Move: {move}")
+    print("\n--- Using IDS ---")
+    solution_ids = ids(start, goal)
+    if not is_solvable(start, goal):
+        print("This state is unsolvable.")
+    elif solution_ids is None:
+        print("No solution found (IDS within depth limit).")
+    else:
+        state = start
+        pos = state.index(0)
+        print("Initial State:")
         print_matrix(state)
-        m+=1
-print("moves =",m)
+        for move in solution_ids:
+            state, pos = apply_move(state, move, pos)
+            print(f"Move: {move}")
+            print_matrix(state)
+            m+=1
+    print("moves =",m)
@@ -1,48 +1,35 @@
-def print_board(board):
-    n = len(board)
-    print("Board Visualization:")
-    for row in range(n):
-        line = ""
-        for col in range(n):
-            if board[col] == row:
-                line += "Q "
-            else:
-                line += ". "
-        print(line)
-    print("-" * (2 * n))
+from n_queens import ConflictBoard
+from trace_sinks import ConsoleSink
 
 def calculate_heuristic(board):
-    n = len(board)
-    attacking_pairs = 0
-    for i in range(n):
-        for j in range(i + 1, n):
-            if board[i] == board[j]:
-                attacking_pairs += 1
-            if abs(board[i] - board[j]) == abs(i - j):
-                attacking_pairs += 1
-    return attacking_pairs
+    # Attacking pairs, counted in O(n) from row and diagonal occupancy counters
+    return ConflictBoard.from_board(board).h
 
-def solve_and_show_steps(initial_board):
-    current_board = list(initial_board)
+def solve_and_show_steps(initial_board, sink=None):
+    # Steps, evaluated neighbors and decisions are reported to `sink` (see
+    # trace_sinks.py); the default ConsoleSink prints all of them. Pass a
+    # NullSink, SampledSink or JsonLinesSink to keep printing off the hot path.
+    if sink is None:
+        sink = ConsoleSink()
+    trace_neighbors = sink.neighbors
+
+    # The counters are kept across steps, so every neighbor is scored in O(1)
+    # from the current cost instead of being re-evaluated from scratch
+    counters = ConflictBoard.from_board(initial_board)
+    current_board = counters.board
     n = len(current_board)
     step = 1
 
     while True:
-        current_heuristic = calculate_heuristic(current_board)
-
-        print(f"\n{'='*10} Step {step} {'='*10}")
-        print(f"Current State: {current_board}")
-        print_board(current_board)
-        print(f"Current Cost (h) = {current_heuristic}")
+        current_heuristic = counters.h
+        sink.step(step, current_board, current_heuristic)
 
         if current_heuristic == 0:
-            print("\nGoal configuration reached! No more attacking pairs.")
-            print("Algorithm terminated successfully.")
+            sink.decision(step, "goal", current_board, current_heuristic)
             break
 
         # --- Neighbor Evaluation ---
-        print("\nEvaluating all neighbor nodes:")
-        best_neighbor = None
+        best_move = None
         best_heuristic = current_heuristic
 
         for col_to_move in range(n):
@@ -51,29 +38,26 @@ def solve_and_show_steps(initial_board):
                 if new_row == original_row:
                     continue  # Skip the current configuration
 
-                neighbor_board = list(current_board)
-                neighbor_board[col_to_move] = new_row
-                neighbor_heuristic = calculate_heuristic(neighbor_board)
-                
-                print(f"  - Neighbor {neighbor_board} -> Cost (h) = {neighbor_heuristic}")
+                neighbor_heuristic = current_heuristic + counters.move_delta(col_to_move, new_row)
+                if trace_neighbors:
+                    sink.neighbor(current_board, col_to_move, new_row, neighbor_heuristic)
 
                 if neighbor_heuristic < best_heuristic:
                     best_heuristic = neighbor_heuristic
-                    best_neighbor = neighbor_board
-        
-        print("-" * 30)
+                    best_move = (col_to_move, new_row)
+
         # --- Decision Making ---
         if best_heuristic >= current_heuristic:
-            print("Decision: No neighbor has a lower cost.")
-            print("Stuck at a local minimum. Algorithm cannot proceed.")
+            sink.decision(step, "stuck", current_board, current_heuristic)
             break
-        
+
         # Otherwise, move to the best neighbor state.
-        print(f"Decision: The best neighbor is {best_neighbor} with a cost of {best_heuristic}.")
-        print(f"Moving to this state as {best_heuristic} < {current_heuristic}.")
-        current_board = best_neighbor
+        sink.decision(step, "move", current_board, current_heuristic, best_move, best_heuristic)
+        counters.move(*best_move)
         step += 1
 
+    return current_board, counters.h
+
 
 # --- Main execution ---
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+import argparse
+import time
+
+import numpy as np
+
+from tsp import MATRIX_LIMIT, city_arrays
+
+# Lockstep annealing of many independent TSP chains with NumPy, for seed and
+# cooling-rate sweeps. The M current tours are rows of one (M, n) integer
+# array; every iteration proposes one random swap per chain (the same move as
+# simulated_annealing), scores all M swaps from the edges they touch, and
+# accepts or rejects them all at once, so the interpreter overhead of an
+# iteration is paid once for the whole batch instead of once per chain.
+
+
+def acceptance_probabilities(current_energy, new_energy, temperature):
+    """Element-wise acceptance_probability for arrays of energies and temperatures."""
+    # exp() of a non-positive number only, so an improving move never overflows
+    return np.where(new_energy < current_energy, 1.0,
+                    np.exp(np.minimum(current_energy - new_energy, 0.0) / temperature))
+
+
+def batch_distance(xs, ys, matrix_limit=MATRIX_LIMIT):
+    """Vectorized dist(a, b) over index arrays, from a matrix for small instances."""
+    x = np.asarray(xs)
+    y = np.asarray(ys)
+    if len(x) <= matrix_limit:
+        matrix = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+        return lambda a, b: matrix[a, b]
+    return lambda a, b: np.hypot(x[a] - x[b], y[a] - y[b])
+
+
+def tour_lengths(tours, dist):
+    """Length of every row of a (M, n) tour array."""
+    return dist(tours, np.roll(tours, -1, axis=1)).sum(axis=1)
+
+
+def batch_anneal(cities, initial_temp, cooling_rate, chains=None, seed=None):
+    """
+    Run independent simulated-annealing chains in lockstep.
+
+    Args:
+        cities (dict): {key: {'x': .., 'y': ..}}, as for simulated_annealing.
+        initial_temp, cooling_rate (float or array): Per-chain schedule; scalars
+            and arrays are broadcast against each other (and against `chains`),
+            so e.g. cooling_rate=np.geomspace(1e-4, 1e-2, 64) sweeps 64 rates.
+        chains (int): Number of chains when both schedule arguments are scalars.
+        seed: Seed for np.random.default_rng.
+
+    Each chain stops once its own temperature drops to 1, exactly as
+    simulated_annealing does. Finished chains drop out of the batch, but the
+    per-iteration overhead is paid until the slowest one is done, so batch
+    chains with schedules of similar length together.
+
+    Returns:
+        tuple: (tours, energies) with the best tour of every chain as a list of
+        city keys and a float array of their lengths.
+    """
+    city_keys, xs, ys = city_arrays(cities)
+    n = len(city_keys)
+    temps, rates = np.broadcast_arrays(np.asarray(initial_temp, dtype=float),
+                                       np.asarray(cooling_rate, dtype=float))
+    if chains is not None:
+        temps = np.broadcast_to(temps, (chains,))
+        rates = np.broadcast_to(rates, (chains,))
+    temps = np.atleast_1d(temps).astype(float)
+    factors = 1 - np.atleast_1d(rates)
+    m = len(temps)
+    rng = np.random.default_rng(seed)
+    dist = batch_distance(xs, ys)
+
+    tours = rng.permuted(np.tile(np.arange(n), (m, 1)), axis=1)
+    energies = tour_lengths(tours, dist)
+    best_tours = tours.copy()
+    best_energies = energies.copy()
+
+    # Per-iteration work is restricted to the chains that are still hot; the
+    # per-chain arrays below are compacted whenever some of them finish
+    live = np.flatnonzero(temps > 1) if n > 2 else np.arange(0)
+    temps, factors, energies = temps[live], factors[live], energies[live]
+    while len(live):
+        k = len(live)
+        # Two distinct positions per chain, i < j
+        i = rng.integers(0, n, k)
+        j = (i + rng.integers(1, n, k)) % n
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        a = tours[live, i]
+        b = tours[live, j]
+        pa = tours[live, i - 1]
+        na = tours[live, (i + 1) % n]
+        pb = tours[live, j - 1]
+        nb = tours[live, (j + 1) % n]
+
+        # The four edges around i and j; when i and j are neighbours in the cycle
+        # the shared edge a-b is counted twice on the old side and is unchanged
+        delta = (dist(pa, b) + dist(b, na) + dist(pb, a) + dist(a, nb)
+                 - dist(pa, a) - dist(a, na) - dist(pb, b) - dist(b, nb))
+        adjacent = (j - i == 1) | (j - i == n - 1)
+        delta = np.where(adjacent, delta + 2 * dist(a, b), delta)
+
+        new_energies = energies + delta
+        accept = acceptance_probabilities(energies, new_energies, temps) > rng.random(k)
+        moved = live[accept]
+        tours[moved, i[accept]] = b[accept]
+        tours[moved, j[accept]] = a[accept]
+        energies = np.where(accept, new_energies, energies)
+
+        improved = energies < best_energies[live]
+        if improved.any():
+            best_tours[live[improved]] = tours[live[improved]]
+            best_energies[live[improved]] = energies[improved]
+
+        temps = temps * factors
+        hot = temps > 1
+        if not hot.all():
+            live, temps, factors, energies = live[hot], temps[hot], factors[hot], energies[hot]
+
+    # Re-measure so rounding in the running sums doesn't leak out
+    best_energies = tour_lengths(best_tours, dist)
+    return [[city_keys[c] for c in tour] for tour in best_tours.tolist()], best_energies
+
+
+# Example Usage:
+#   python batch_annealing.py 50 --chains 256
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep annealing cooling rates in one batch.")
+    parser.add_argument("n", type=int, nargs="?", default=50, help="number of random cities")
+    parser.add_argument("--chains", type=int, default=64)
+    parser.add_argument("--temp", type=float, default=10000)
+    parser.add_argument("--min-rate", type=float, default=1e-3)
+    parser.add_argument("--max-rate", type=float, default=1e-2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cities = {i: {'x': x, 'y': y} for i, (x, y) in enumerate(rng.random((args.n, 2)) * 1000)}
+    rates = np.geomspace(args.min_rate, args.max_rate, args.chains)
+    started = time.perf_counter()
+    tours, energies = batch_anneal(cities, args.temp, rates, seed=args.seed)
+    print(f"{args.chains} chains on {args.n} cities in {time.perf_counter() - started:.2f}s")
+    for rate, energy in zip(rates[::max(1, args.chains // 8)], energies[::max(1, args.chains // 8)]):
+        print(f"  cooling rate {rate:.2e}: best tour length {energy:.1f}")
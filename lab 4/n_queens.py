@@ -0,0 +1,310 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# N-Queens with O(1) move scoring. As in the hill-climbing script, a board is a
+# list where board[col] is the row of the queen in that column. The number of
+# attacking pairs h is kept up to date from occupancy counters for every row,
+# diagonal (row - col) and anti-diagonal (row + col): a line holding k queens
+# contributes k * (k - 1) / 2 pairs, so moving one queen changes h by an amount
+# that only depends on the counters of the six lines it leaves and enters.
+
+
+class ConflictBoard:
+    def __init__(self, n):
+        self.n = n
+        self.board = [None] * n
+        self.rows = [0] * n
+        self.diagonals = [0] * (2 * n - 1)       # indexed by row - col + n - 1
+        self.anti_diagonals = [0] * (2 * n - 1)  # indexed by row + col
+        self.h = 0
+
+    @classmethod
+    def from_board(cls, board):
+        cb = cls(len(board))
+        for col, row in enumerate(board):
+            cb.place(col, row)
+        return cb
+
+    def _add(self, col, row):
+        # Attacking pairs gained by putting a queen on (col, row)
+        d = row - col + self.n - 1
+        a = row + col
+        gained = self.rows[row] + self.diagonals[d] + self.anti_diagonals[a]
+        self.rows[row] += 1
+        self.diagonals[d] += 1
+        self.anti_diagonals[a] += 1
+        return gained
+
+    def _remove(self, col, row):
+        # Attacking pairs lost by taking the queen off (col, row)
+        d = row - col + self.n - 1
+        a = row + col
+        self.rows[row] -= 1
+        self.diagonals[d] -= 1
+        self.anti_diagonals[a] -= 1
+        return self.rows[row] + self.diagonals[d] + self.anti_diagonals[a]
+
+    def place(self, col, row):
+        self.h += self._add(col, row)
+        self.board[col] = row
+
+    def conflicts(self, col):
+        """Number of queens attacking the queen in column `col`."""
+        row = self.board[col]
+        return (self.rows[row] + self.diagonals[row - col + self.n - 1]
+                + self.anti_diagonals[row + col] - 3)
+
+    def move_delta(self, col, row):
+        """Change in h if the queen in `col` moved to `row`, without moving it."""
+        old = self.board[col]
+        if row == old:
+            return 0
+        n = self.n
+        # A queen moving within its column never stays on the same line
+        return (self.rows[row] + self.diagonals[row - col + n - 1] + self.anti_diagonals[row + col]
+                - self.conflicts(col))
+
+    def move(self, col, row):
+        self.h += -self._remove(col, self.board[col]) + self._add(col, row)
+        self.board[col] = row
+
+    def swap(self, a, b):
+        """Exchange the rows of the queens in columns a and b; returns the change in h."""
+        ra, rb = self.board[a], self.board[b]
+        delta = -self._remove(a, ra) - self._remove(b, rb)
+        delta += self._add(a, rb) + self._add(b, ra)
+        self.board[a], self.board[b] = rb, ra
+        self.h += delta
+        return delta
+
+    def swap_delta(self, a, b):
+        delta = self.swap(a, b)
+        self.swap(a, b)
+        return delta
+
+
+def greedy_permutation(n, rng, tries=128):
+    """
+    Place one queen per column on distinct rows, trying up to `tries` unused rows
+    for each column and keeping the first with no diagonal conflict (or the
+    least bad one). Leaves only a handful of conflicts even for very large n.
+    """
+    cb = ConflictBoard(n)
+    unused = list(range(n))
+    for col in range(n):
+        best_index, best_cost = 0, None
+        for _ in range(min(tries, len(unused))):
+            i = rng.randrange(len(unused))
+            row = unused[i]
+            cost = cb.diagonals[row - col + n - 1] + cb.anti_diagonals[row + col]
+            if best_cost is None or cost < best_cost:
+                best_index, best_cost = i, cost
+                if cost == 0:
+                    break
+        row = unused[best_index]
+        unused[best_index] = unused[-1]
+        unused.pop()
+        cb.place(col, row)
+    return cb
+
+
+def min_conflicts(n, max_steps=None, rng=None, candidates=32, board=None, noise=0.1):
+    """
+    Min-conflicts local search. Each step picks a random attacked queen and swaps
+    its row with the partner column (out of `candidates` random ones, or all of
+    them for small boards) that leaves the fewest attacking pairs, with ties
+    broken at random and sideways swaps allowed. At a local minimum, where every
+    swap makes things worse, and otherwise with probability `noise`, a random
+    partner is taken instead. Every swap is scored in
+    O(1), so a step costs O(candidates) whatever the board size.
+
+    Returns (board, steps) with board None if max_steps ran out first.
+    """
+    if n in (2, 3):
+        return None, 0  # no solutions exist
+    if rng is None:
+        rng = random.Random()
+    cb = ConflictBoard.from_board(board) if board is not None else greedy_permutation(n, rng)
+    suspects = []  # columns that may be attacked; rescanned if it runs dry
+    steps = 0
+
+    while cb.h:
+        if not suspects:
+            suspects = [col for col in range(n) if cb.conflicts(col)]
+        i = rng.randrange(len(suspects))
+        col = suspects[i]
+        if cb.conflicts(col) == 0:
+            suspects[i] = suspects[-1]
+            suspects.pop()
+            continue
+        if steps == max_steps:
+            return None, steps
+        steps += 1
+
+        if n - 1 <= candidates:
+            partners = range(n)
+        else:
+            partners = [rng.randrange(n) for _ in range(candidates)]
+        best, best_delta = [], None
+        for other in partners:
+            if other == col:
+                continue
+            delta = cb.swap_delta(col, other)
+            if best_delta is None or delta < best_delta:
+                best, best_delta = [other], delta
+            elif delta == best_delta:
+                best.append(other)
+        if best:
+            if best_delta > 0 or rng.random() < noise:
+                # Random swap of the attacked queen: walks out of local minima
+                # and plateaus that the greedy choice would keep cycling on
+                other = rng.choice([p for p in partners if p != col])
+            else:
+                other = rng.choice(best)
+            cb.swap(col, other)
+            if cb.conflicts(other):
+                suspects.append(other)
+    return cb.board, steps
+
+
+def hill_climb(n, rng, max_sideways=0, stop=None):
+    """
+    Steepest-ascent hill climbing from a random board drawn from `rng`. Moves
+    that keep h the same are allowed up to `max_sideways` times in a row (0 is
+    plain hill climbing, which stops at the first local minimum or plateau).
+    `stop` is an optional event checked every step to abandon the climb.
+
+    Returns (board, steps) with board None if the climb got stuck.
+    """
+    cb = ConflictBoard.from_board([rng.randrange(n) for _ in range(n)])
+    sideways = steps = 0
+    while cb.h:
+        if stop is not None and stop.is_set():
+            return None, steps
+        best, best_delta = [], 0
+        for col in range(n):
+            current = cb.board[col]
+            for row in range(n):
+                if row == current:
+                    continue
+                delta = cb.move_delta(col, row)
+                if delta < best_delta:
+                    best, best_delta = [(col, row)], delta
+                elif delta == best_delta:
+                    best.append((col, row))
+        if not best:
+            return None, steps  # strict local minimum
+        if best_delta == 0:
+            if sideways == max_sideways:
+                return None, steps
+            sideways += 1
+        else:
+            sideways = 0
+        cb.move(*rng.choice(best))
+        steps += 1
+    return cb.board, steps
+
+
+_stop = None  # set in each worker process by _init_worker
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _attempt(n, seed, max_sideways):
+    board, steps = hill_climb(n, random.Random(seed), max_sideways, _stop)
+    return seed, board, steps
+
+
+def random_restart(n, max_restarts=1000, max_sideways=100, workers=None, base_seed=0):
+    """
+    Random-restart hill climbing. Restart i climbs with its own
+    random.Random(base_seed + i); restarts are run across a process pool and,
+    as soon as one reaches h = 0, the ones still queued are cancelled and the
+    running ones are told to stop. workers=1 runs the restarts in-process.
+
+    Returns a dict with the board, the winning seed (hill_climb(n,
+    random.Random(seed), max_sideways) reproduces it), its steps and the
+    number of restarts that finished, or None if all restarts got stuck.
+    """
+    seeds = iter(range(base_seed, base_seed + max_restarts))
+    if workers == 1:
+        for restarts, seed in enumerate(seeds, 1):
+            board, steps = hill_climb(n, random.Random(seed), max_sideways)
+            if board is not None:
+                return {"board": board, "seed": seed, "steps": steps, "restarts": restarts}
+        return None
+
+    stop = multiprocessing.Event()
+    result = None
+    restarts = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(stop,)) as pool:
+        in_flight = 2 * workers  # keeps every worker busy while results come back
+        pending = {pool.submit(_attempt, n, seed, max_sideways)
+                   for seed in itertools.islice(seeds, in_flight)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                seed, board, steps = future.result()
+                restarts += 1
+                if board is not None and result is None:
+                    result = {"board": board, "seed": seed, "steps": steps}
+            if result is not None:
+                stop.set()
+                for future in pending:
+                    future.cancel()
+                break
+            for seed in itertools.islice(seeds, len(done)):
+                pending.add(pool.submit(_attempt, n, seed, max_sideways))
+    if result is not None:
+        result["restarts"] = restarts
+    return result
+
+
+def attacking_pairs(board):
+    """Independent O(n) count of attacking pairs, for checking results."""
+    return ConflictBoard.from_board(board).h
+
+
+# Example Usage:
+#   python n_queens.py 1000000
+#   python n_queens.py 8 --strategy restarts --sideways 100 --workers 4
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve N-Queens by local search.")
+    parser.add_argument("n", type=int, nargs="?", default=1000)
+    parser.add_argument("--strategy", choices=["min-conflicts", "restarts"], default="min-conflicts")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--sideways", type=int, default=100, help="max consecutive sideways moves")
+    parser.add_argument("--restarts", type=int, default=1000, help="max random restarts")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    n = args.n
+
+    started = time.perf_counter()
+    if args.strategy == "min-conflicts":
+        board, steps = min_conflicts(n, rng=random.Random(args.seed))
+        summary = f"Solved in {steps} steps"
+    else:
+        result = random_restart(n, args.restarts, args.sideways, args.workers, args.seed or 0)
+        board = None if result is None else result["board"]
+        if result is not None:
+            summary = (f"Solved after {result['restarts']} restarts; winning seed "
+                       f"{result['seed']} took {result['steps']} steps")
+    elapsed = time.perf_counter() - started
+
+    print(f"--- Solving {n}-Queens with {args.strategy} ---")
+    if board is None:
+        print(f"No solution found ({elapsed:.2f}s)")
+    else:
+        print(f"{summary}, {elapsed:.2f}s")
+        print(f"Attacking pairs in the result: {attacking_pairs(board)}")
+        if n <= 20:
+            print(f"Board: {board}")
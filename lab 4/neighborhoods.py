@@ -0,0 +1,377 @@
+import heapq
+import math
+import random
+import sys
+import time
+
+from tsp import distance_function, tour_length
+
+# Move neighborhoods for annealing large TSP instances.
+#
+# A move is a function move(state, rng) that proposes a random change to the
+# tour held in a TourState and returns (delta, apply), where delta is the
+# change in tour length and apply() performs it, or None if the draw was
+# unusable. Proposing never modifies the tour, so rejected moves cost nothing
+# to undo. Partner cities are drawn from each city's k nearest neighbors, which
+# keeps almost every proposal local enough to have a chance of being accepted.
+
+
+class TourState:
+    """A tour plus the position of every city in it, with 2-opt style edge exchanges."""
+
+    def __init__(self, tour, dist, neighbors):
+        self.dist = dist
+        self.neighbors = neighbors
+        self.reset(tour)
+
+    def reset(self, tour):
+        """Start over from `tour` (same cities, any order)."""
+        self.tour = list(tour)
+        self.n = len(self.tour)
+        self.pos = [0] * self.n
+        for i, city in enumerate(self.tour):
+            self.pos[city] = i
+
+    def succ(self, city):
+        i = self.pos[city] + 1
+        return self.tour[i if i < self.n else 0]
+
+    def _reverse(self, i, j):
+        # Reverse tour positions i..j (going forward, possibly wrapping). Reversing
+        # the complementary stretch gives the same cycle, so the shorter one is used.
+        n = self.n
+        m = (j - i) % n + 1
+        if 2 * m > n:
+            i, j, m = (j + 1) % n, (i - 1) % n, n - m
+        tour, pos = self.tour, self.pos
+        for _ in range(m // 2):
+            a, b = tour[i], tour[j]
+            tour[i], tour[j] = b, a
+            pos[b], pos[a] = i, j
+            i = i + 1 if i + 1 < n else 0
+            j = j - 1 if j else n - 1
+
+    def exchange(self, a, b, c, d):
+        """
+        Replace edges (a, b) and (c, d) by (a, c) and (b, d). b must follow a and
+        d follow c in the same direction of travel (either direction).
+        """
+        if self.succ(a) == b:
+            self._reverse(self.pos[b], self.pos[c])
+        else:
+            self._reverse(self.pos[a], self.pos[d])
+
+
+def two_opt(state, rng):
+    """Reverse the stretch between a random city's successor and one of its neighbors."""
+    tour, dist = state.tour, state.dist
+    a = tour[rng.randrange(state.n)]
+    b = state.succ(a)
+    c = rng.choice(state.neighbors[a])
+    d = state.succ(c)
+    if c == b or d == a:
+        return None
+    delta = dist(a, c) + dist(b, d) - dist(a, b) - dist(c, d)
+    return delta, lambda: state.exchange(a, b, c, d)
+
+
+def _move_segment(state, rng, length):
+    # Cut the `length` cities starting at a random position out from between p
+    # and q and put them back, in the cheaper orientation, between a neighbor c
+    # of their first city and c's successor e.
+    n = state.n
+    if n < length + 3:
+        return None
+    tour, pos, dist = state.tour, state.pos, state.dist
+    i = rng.randrange(n)
+    s1, sl = tour[i], tour[(i + length - 1) % n]
+    p, q = tour[i - 1], tour[(i + length) % n]
+    c = rng.choice(state.neighbors[s1])
+    if c == p or (pos[c] - i) % n < length:
+        return None
+    e = state.succ(c)
+    if e == p:
+        return None
+
+    forward = dist(c, s1) + dist(sl, e)
+    backward = dist(c, sl) + dist(s1, e)
+    reverse = backward <= forward
+    delta = (dist(p, q) + min(forward, backward)
+             - dist(p, s1) - dist(sl, q) - dist(c, e))
+
+    def apply():
+        state.exchange(p, s1, c, e)       # p c..q sl..s1 e
+        if c != q:
+            state.exchange(p, c, q, sl)   # p q..c sl..s1 e
+        if not reverse:
+            state.exchange(c, sl, s1, e)  # c s1..sl e
+
+    return delta, apply
+
+
+def or_opt(state, rng):
+    """Move a run of two or three consecutive cities next to a neighbor."""
+    return _move_segment(state, rng, rng.choice((2, 3)))
+
+
+def insertion(state, rng):
+    """Move one city next to one of its neighbors."""
+    return _move_segment(state, rng, 1)
+
+
+MOVES = (two_opt, or_opt, insertion)
+
+
+def nearest_neighbors(xs, ys, k=8):
+    """
+    The k nearest cities of every city, closest first. Cities are bucketed in a
+    uniform grid with about two per cell and each search widens ring by ring
+    only until no unseen cell can hold anything closer, so the whole build is
+    close to linear in the number of cities.
+    """
+    n = len(xs)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+    min_x, min_y = min(xs), min(ys)
+    side = max(max(xs) - min_x, max(ys) - min_y) or 1.0
+    g = max(1, int(math.sqrt(n / 2)))
+    width = side / g
+    cells = [[] for _ in range(g * g)]
+    cell_of = [0] * n
+    for city in range(n):
+        cx = min(int((xs[city] - min_x) / width), g - 1)
+        cy = min(int((ys[city] - min_y) / width), g - 1)
+        cell_of[city] = (cx, cy)
+        cells[cx * g + cy].append(city)
+
+    neighbors = []
+    for city in range(n):
+        x, y = xs[city], ys[city]
+        cx, cy = cell_of[city]
+        found = []  # (squared distance, other city)
+        ring = 0
+        while True:
+            for gx in range(cx - ring, cx + ring + 1):
+                if gx < 0 or gx >= g:
+                    continue
+                for gy in range(cy - ring, cy + ring + 1):
+                    if gy < 0 or gy >= g:
+                        continue
+                    if ring and cx - ring < gx < cx + ring and cy - ring < gy < cy + ring:
+                        continue  # inside the ring, already searched
+                    for other in cells[gx * g + gy]:
+                        if other != city:
+                            found.append(((xs[other] - x) ** 2 + (ys[other] - y) ** 2, other))
+            # Every unsearched cell is at least ring * width away
+            if len(found) >= k:
+                kth = heapq.nsmallest(k, found)[-1][0]
+                if kth <= (ring * width) ** 2:
+                    break
+            if ring > g:
+                break
+            ring += 1
+        neighbors.append([other for _, other in heapq.nsmallest(k, found)])
+    return neighbors
+
+
+def strip_tour(xs, ys):
+    """
+    Starting tour: cut the plane into vertical strips and visit them left to
+    right, going up one strip and down the next. O(n log n) and far shorter
+    than a random tour, which keeps early reversals short on big instances.
+    """
+    n = len(xs)
+    strips = max(1, int(math.sqrt(n / 2)))
+    min_x = min(xs)
+    width = ((max(xs) - min_x) or 1.0) / strips
+
+    def key(city):
+        s = min(int((xs[city] - min_x) / width), strips - 1)
+        return (s, ys[city] if s % 2 == 0 else -ys[city])
+
+    return sorted(range(n), key=key)
+
+
+def anneal(state, initial_temp, cooling_rate, moves=MOVES, rng=None, snapshot_interval=None,
+           telemetry=None):
+    """
+    Simulated annealing over `moves` with the same geometric schedule as
+    simulated_annealing. Copying a huge tour on every new best would dominate
+    the run, so the best tour is snapshotted at most once every
+    `snapshot_interval` iterations (default: the number of cities); the
+    returned tour is the better of the last snapshot and the final tour.
+    `telemetry` is an optional telemetry.Telemetry to sample the run into.
+
+    Returns (best tour, its length).
+    """
+    if rng is None:
+        rng = random.Random()
+    if snapshot_interval is None:
+        snapshot_interval = state.n
+    current = lowest = tour_length(state.tour, state.dist)
+    best, best_energy = list(state.tour), current
+    last_snapshot = iteration = accepted = 0
+    temp = initial_temp
+    next_sample = 0  # iteration of the next telemetry sample; 0 never comes
+    if telemetry is not None:
+        next_sample = telemetry.every
+        telemetry.start()
+
+    while temp > 1:
+        iteration += 1
+        proposal = moves[rng.randrange(len(moves))](state, rng)
+        if proposal is not None:
+            delta, apply = proposal
+            if delta < 0 or math.exp(-delta / temp) > rng.random():
+                apply()
+                current += delta
+                accepted += 1
+                if current < lowest:
+                    lowest = current
+                if current < best_energy and iteration - last_snapshot >= snapshot_interval:
+                    best, best_energy = list(state.tour), current
+                    last_snapshot = iteration
+        if iteration == next_sample:
+            telemetry.sample(iteration, current, lowest, temp, accepted)
+            next_sample += telemetry.every
+        temp *= (1 - cooling_rate)
+
+    final = tour_length(state.tour, state.dist)
+    best_energy = tour_length(best, state.dist)
+    if final <= best_energy:
+        return list(state.tour), final
+    return best, best_energy
+
+
+def anytime_anneal(state, time_limit=None, max_evaluations=None, callback=None, moves=MOVES,
+                   rng=None, initial_temp=None, start_acceptance=0.3, end_acceptance=0.005,
+                   window=1000, patience=100, reheat=5.0, telemetry=None):
+    """
+    Annealing that runs for a budget instead of a fixed schedule: until
+    `time_limit` seconds have passed or `max_evaluations` moves have been
+    proposed, whichever comes first.
+
+    Instead of cooling geometrically, the temperature is retuned every
+    `window` proposals so the acceptance rate follows a target that falls from
+    `start_acceptance` to `end_acceptance` over the budget. If the lowest
+    length seen has not improved for `patience` windows, the search restarts
+    from the best tour at `reheat` times the temperature. The initial
+    temperature is estimated from sample moves unless given.
+
+    callback(tour, length) is called with the best tour so far whenever it is
+    snapshotted (at most once every n proposals, as in anneal) and once at the
+    end; the tour is a fresh list the callback may keep. If it returns a true
+    value the run stops. An optional telemetry.Telemetry is sampled at the
+    end of the first window to pass each multiple of `telemetry.every`
+    proposals (so once per window when the window is the longer of the two).
+
+    Returns (best tour, its length).
+    """
+    if time_limit is None and max_evaluations is None:
+        raise ValueError("anytime_anneal needs a time_limit or max_evaluations")
+    if rng is None:
+        rng = random.Random()
+    clock = time.perf_counter
+    started = clock()
+    dist = state.dist
+
+    if initial_temp is None:
+        # The mean uphill step of a few random proposals, accepted at start_acceptance
+        uphill = [p[0] for p in (moves[rng.randrange(len(moves))](state, rng) for _ in range(100))
+                  if p is not None and p[0] > 0]
+        initial_temp = (-sum(uphill) / len(uphill) / math.log(start_acceptance)) if uphill else 1.0
+    temp = initial_temp
+
+    current = lowest = tour_length(state.tour, dist)
+    best, best_energy = list(state.tour), current
+    reported = None
+    evaluations = last_snapshot = stale = total_accepted = 0
+    stop = False
+    if telemetry is not None:
+        next_sample = telemetry.every
+        telemetry.start()
+
+    while not stop:
+        size = window if max_evaluations is None else min(window, max_evaluations - evaluations)
+        if size <= 0:
+            break
+        accepted = 0
+        improved = False
+        for _ in range(size):
+            evaluations += 1
+            proposal = moves[rng.randrange(len(moves))](state, rng)
+            if proposal is None:
+                continue
+            delta, apply = proposal
+            if delta < 0 or math.exp(-delta / temp) > rng.random():
+                apply()
+                current += delta
+                accepted += 1
+                if current < lowest:
+                    lowest = current
+                    improved = True
+                    if evaluations - last_snapshot >= state.n:
+                        best, best_energy = list(state.tour), current
+                        last_snapshot = evaluations
+                        if callback is not None:
+                            reported = best_energy
+                            stop = callback(list(best), best_energy)
+                            if stop:
+                                break
+
+        total_accepted += accepted
+        if telemetry is not None and evaluations >= next_sample:
+            telemetry.sample(evaluations, current, lowest, temp, total_accepted)
+            # From the current count: a window may cover several multiples of every
+            next_sample = evaluations - evaluations % telemetry.every + telemetry.every
+        progress = 0.0
+        if max_evaluations is not None:
+            progress = evaluations / max_evaluations
+        if time_limit is not None:
+            progress = max(progress, (clock() - started) / time_limit)
+        if progress >= 1:
+            break
+
+        # Retune toward the target acceptance rate, at most halving or doubling
+        target = start_acceptance * (end_acceptance / start_acceptance) ** progress
+        rate = max(accepted / size, 1 / size)
+        temp *= min(2.0, max(0.5, math.sqrt(target / rate)))
+
+        stale = 0 if improved else stale + 1
+        if stale >= patience:
+            if current < best_energy:
+                best, best_energy = list(state.tour), current
+            state.reset(best)
+            current = best_energy
+            temp *= reheat
+            stale = 0
+
+    final = tour_length(state.tour, dist)
+    best_energy = tour_length(best, dist)
+    if final < best_energy:
+        best, best_energy = list(state.tour), final
+    if callback is not None and best_energy != reported:
+        callback(list(best), best_energy)
+    return best, best_energy
+
+
+# Example Usage:
+#   python neighborhoods.py 10000
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(1)
+    xs = [rng.random() * 1000 for _ in range(n)]
+    ys = [rng.random() * 1000 for _ in range(n)]
+
+    started = time.perf_counter()
+    dist = distance_function(xs, ys)
+    neighbors = nearest_neighbors(xs, ys)
+    tour = strip_tour(xs, ys)
+    print(f"Setup for {n} cities: {time.perf_counter() - started:.2f}s, "
+          f"strip tour length {tour_length(tour, dist):.0f}")
+
+    started = time.perf_counter()
+    state = TourState(tour, dist, neighbors)
+    best, length = anneal(state, initial_temp=10, cooling_rate=1e-6, rng=rng)
+    print(f"Annealed tour length {length:.0f} in {time.perf_counter() - started:.2f}s")
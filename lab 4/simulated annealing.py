@@ -1,11 +1,21 @@
 import math
 import random
+import sys
+
+from neighborhoods import MOVES, TourState, anneal, anytime_anneal, nearest_neighbors, strip_tour
+from tsp import CityArrays, city_arrays, city_distance, swap_cities, tour_length
+from tsplib import load
 
 def calculate_total_distance(tour, cities):
     """
     Calculates the total distance of a tour.
     A tour is a list of city indices in the order they are visited.
+    `cities` is either a dict of {'x', 'y'} dicts or a CityArrays from tsplib.py.
     """
+    if isinstance(cities, CityArrays):
+        position = cities.position
+        return tour_length([position(key) for key in tour], cities.distance_function())
+
     total_distance = 0
     num_cities = len(tour)
     for i in range(num_cities):
@@ -35,25 +45,66 @@ def acceptance_probability(current_energy, new_energy, temperature):
         return 1.0
     return math.exp((current_energy - new_energy) / temperature)
 
-def simulated_annealing(cities, initial_temp, cooling_rate):
+def simulated_annealing(cities, initial_temp, cooling_rate, moves=None, k=8,
+                        time_limit=None, max_evaluations=None, callback=None, telemetry=None):
     """
     Implements the Simulated Annealing algorithm to find the shortest tour for TSP.
 
     Args:
         cities (dict): A dictionary where keys are city indices and values are
-                       dictionaries with 'x' and 'y' coordinates.
+                       dictionaries with 'x' and 'y' coordinates, or a
+                       CityArrays loaded by tsplib.py.
         initial_temp (float): The starting temperature for the annealing process.
         cooling_rate (float): The rate at which the temperature decreases.
+        moves (sequence, optional): Move functions from neighborhoods.py (e.g.
+                       neighborhoods.MOVES for 2-opt, Or-opt and insertion).
+                       By default two random cities are swapped.
+        k (int): Size of the nearest-neighbor candidate lists used by `moves`.
+        time_limit (float), max_evaluations (int): Run as an anytime search
+                       with this budget instead of cooling to 1 (see
+                       neighborhoods.anytime_anneal); implies moves=MOVES
+                       unless given, and cooling_rate is then unused.
+        callback (callable): With a budget, called as callback(tour, length)
+                       with each new best tour found; returning True stops.
+        telemetry (Telemetry, optional): Sampled every `telemetry.every`
+                       iterations with the energy, best energy, temperature,
+                       acceptance rate and moves per second (see telemetry.py).
 
     Returns:
         tuple: A tuple containing the best tour found (list of city indices) and
                its total distance (float).
     """
     # 1. Initialization
-    city_indices = list(cities.keys())
+    # Work on positions into flat coordinate arrays; the keys are mapped back at the end
+    city_keys, xs, ys = city_arrays(cities)
+    dist = city_distance(cities, xs, ys)
+    num_cities = len(city_keys)
+
+    budgeted = time_limit is not None or max_evaluations is not None
+    if budgeted and moves is None:
+        moves = MOVES
+    if moves is not None:
+        if len(xs) != num_cities:
+            raise ValueError("neighborhood moves need city coordinates")
+        # Neighborhood moves over k-nearest-neighbor candidates, from a strip tour
+        tour = strip_tour(xs, ys)
+        print(f"Initial strip tour distance: {tour_length(tour, dist):.2f}")
+        state = TourState(tour, dist, nearest_neighbors(xs, ys, k))
+        if budgeted:
+            report = None
+            if callback is not None:
+                report = lambda tour, length: callback([city_keys[i] for i in tour], length)
+            best_solution, best_energy = anytime_anneal(state, time_limit, max_evaluations, report,
+                                                        moves, initial_temp=initial_temp,
+                                                        telemetry=telemetry)
+        else:
+            best_solution, best_energy = anneal(state, initial_temp, cooling_rate, moves,
+                                                telemetry=telemetry)
+        return [city_keys[i] for i in best_solution], best_energy
+
     # Start with a random tour
-    current_solution = random.sample(city_indices, len(city_indices))
-    current_energy = calculate_total_distance(current_solution, cities)
+    current_solution = random.sample(range(num_cities), num_cities)
+    current_energy = tour_length(current_solution, dist)
 
     print(f"Initial random tour distance: {current_energy:.2f}")
 
@@ -63,43 +114,57 @@ def simulated_annealing(cities, initial_temp, cooling_rate):
 
     temp = initial_temp
 
+    # Counters for the optional telemetry; with none, next_sample = 0 is never reached
+    iteration = accepted = 0
+    next_sample = 0
+    if telemetry is not None:
+        next_sample = telemetry.every
+        telemetry.start()
+
     # 2. Main Loop
     # The algorithm stops when the system has "cooled" enough
-    while temp > 1:
+    while temp > 1 and num_cities > 1:
+        iteration += 1
         # 3. Generate a Neighboring Solution
-        # Create a new solution by swapping two random cities in the current tour
-        new_solution = list(current_solution)
-        pos1 = random.randint(0, len(cities) - 1)
-        pos2 = random.randint(0, len(cities) - 1)
+        # Swap two random cities in the current tour, in place
+        pos1 = random.randint(0, num_cities - 1)
+        pos2 = random.randint(0, num_cities - 1)
         # Ensure pos1 and pos2 are different
         while pos1 == pos2:
-            pos2 = random.randint(0, len(cities) - 1)
+            pos2 = random.randint(0, num_cities - 1)
 
-        new_solution[pos1], new_solution[pos2] = new_solution[pos2], new_solution[pos1]
-
-        # 4. Calculate Energy of the Neighbor
-        new_energy = calculate_total_distance(new_solution, cities)
+        # 4. Calculate Energy of the Neighbor from the four edges that changed
+        new_energy = current_energy + swap_cities(current_solution, pos1, pos2, dist)
 
         # 5. Decide Whether to Accept the Neighbor
         if acceptance_probability(current_energy, new_energy, temp) > random.random():
-            current_solution = list(new_solution)
             current_energy = new_energy
+            accepted += 1
+        else:
+            swap_cities(current_solution, pos1, pos2, dist)  # undo
 
         # Update the best solution found if the current one is better
         if current_energy < best_energy:
             best_solution = list(current_solution)
             best_energy = current_energy
-        
+
+        if iteration == next_sample:
+            telemetry.sample(iteration, current_energy, best_energy, temp, accepted)
+            next_sample += telemetry.every
+
         # 6. Cool the Temperature
         temp *= (1 - cooling_rate)
 
-    return best_solution, best_energy
+    # Re-measure the best tour so rounding in the running sum doesn't leak out
+    best_energy = tour_length(best_solution, dist)
+    return [city_keys[i] for i in best_solution], best_energy
 
 # --- Main execution block ---
 if __name__ == '__main__':
     # Define a set of cities with their (x, y) coordinates
     # For simplicity, we use a dictionary. The keys are identifiers.
-    cities = {
+    # A .tsp or .csv file given on the command line is used instead.
+    cities = load(sys.argv[1]) if len(sys.argv) > 1 else {
         0: {'x': 60, 'y': 200},
         1: {'x': 180, 'y': 200},
         2: {'x': 80, 'y': 180},
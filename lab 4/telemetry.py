@@ -0,0 +1,88 @@
+import csv
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: only to_numpy() needs it
+    np = None
+
+# Convergence telemetry for the annealing loops. A solver given a Telemetry
+# calls sample() once every `every` iterations; its inner loop pays one counter
+# increment and one comparison per iteration otherwise, and nothing more when
+# no Telemetry is given. Samples go into preallocated arrays used as a ring
+# buffer, so a long run keeps its most recent `capacity` samples in fixed
+# memory.
+
+FIELDS = ("iteration", "energy", "best_energy", "temperature", "acceptance_rate",
+          "moves_per_second")
+
+
+class Telemetry:
+    def __init__(self, every=1000, capacity=4096):
+        self.every = every
+        self.capacity = capacity
+        self.columns = {field: array('d', bytes(8 * capacity)) for field in FIELDS}
+        self.count = 0  # samples taken, including ones overwritten since
+        self.start()
+
+    def start(self):
+        """Reset the rate counters; solvers call this just before their loop."""
+        self._iteration = 0
+        self._accepted = 0
+        self._time = time.perf_counter()
+
+    def sample(self, iteration, energy, best_energy, temperature, accepted):
+        """
+        Record one sample. `accepted` is the running count of accepted moves;
+        the acceptance rate and moves per second cover the iterations since
+        the previous sample.
+        """
+        now = time.perf_counter()
+        moves = iteration - self._iteration
+        elapsed = now - self._time
+        values = (iteration, energy, best_energy, temperature,
+                  (accepted - self._accepted) / moves if moves else 0.0,
+                  moves / elapsed if elapsed > 0 else 0.0)
+        i = self.count % self.capacity
+        for column, value in zip(self.columns.values(), values):
+            column[i] = value
+        self.count += 1
+        self._iteration, self._accepted, self._time = iteration, accepted, now
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def dropped(self):
+        """Samples lost because the ring buffer wrapped around."""
+        return max(0, self.count - self.capacity)
+
+    def _order(self):
+        # Buffer slots from the oldest sample kept to the newest
+        if self.count <= self.capacity:
+            return range(self.count)
+        first = self.count % self.capacity
+        return [(first + i) % self.capacity for i in range(self.capacity)]
+
+    def rows(self):
+        """The kept samples, oldest first, as tuples in FIELDS order."""
+        columns = list(self.columns.values())
+        for i in self._order():
+            yield tuple(column[i] for column in columns)
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            writer.writerows(self.rows())
+
+    def to_numpy(self):
+        """The kept samples, oldest first, as a structured array with FIELDS as names."""
+        if np is None:
+            raise ImportError("Telemetry.to_numpy() needs NumPy")
+        order = np.asarray(self._order(), dtype=np.intp)
+        samples = np.empty(len(order), dtype=[(field, "f8") for field in FIELDS])
+        for field, column in self.columns.items():
+            samples[field] = np.frombuffer(column, dtype="f8")[order]
+        return samples
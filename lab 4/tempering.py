@@ -0,0 +1,169 @@
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from neighborhoods import MOVES, TourState, nearest_neighbors, strip_tour
+from tsp import city_arrays, distance_function, tour_length
+
+# Parallel tempering (replica exchange) for the TSP. K replicas each run
+# Metropolis moves at a fixed temperature from a geometric ladder; after every
+# round, neighbouring replicas offer to trade tours and accept with probability
+#
+#   min(1, exp((1/T_cold - 1/T_hot) * (E_cold - E_hot)))
+#
+# so good tours drift down to the cold end while the hot end keeps exploring.
+# Each worker process builds the distance lookup and neighbor lists once, in
+# its initializer; after that only tours and energies cross process boundaries.
+
+_problem = None  # (dist, neighbors), set in each worker process by _init_worker
+
+
+def _init_worker(xs, ys, k):
+    global _problem
+    _problem = (distance_function(xs, ys), nearest_neighbors(xs, ys, k))
+
+
+def _run_replica(tour, temp, steps, seed):
+    """
+    `steps` Metropolis moves at constant `temp` from `tour`. Returns the final
+    tour and its length plus the best tour seen (snapshotted at most once per n
+    moves, as in neighborhoods.anneal) and its length.
+    """
+    dist, neighbors = _problem
+    rng = random.Random(seed)
+    state = TourState(tour, dist, neighbors)
+    current = tour_length(state.tour, dist)
+    best, best_energy = list(state.tour), current
+    last_snapshot = 0
+    for step in range(1, steps + 1):
+        proposal = MOVES[rng.randrange(len(MOVES))](state, rng)
+        if proposal is None:
+            continue
+        delta, apply = proposal
+        if delta < 0 or math.exp(-delta / temp) > rng.random():
+            apply()
+            current += delta
+            if current < best_energy and step - last_snapshot >= state.n:
+                best, best_energy = list(state.tour), current
+                last_snapshot = step
+
+    current = tour_length(state.tour, dist)
+    best_energy = tour_length(best, dist)
+    if current <= best_energy:
+        return state.tour, current, state.tour, current
+    return state.tour, current, best, best_energy
+
+
+def temperature_ladder(t_min, t_max, replicas):
+    """`replicas` temperatures from t_min to t_max, evenly spaced on a log scale."""
+    if replicas == 1:
+        return [t_min]
+    ratio = (t_max / t_min) ** (1 / (replicas - 1))
+    return [t_min * ratio ** i for i in range(replicas)]
+
+
+def exchange(tours, energies, temps, offset, rng):
+    """
+    Offer a swap to each pair of neighbouring replicas (i, i + 1) with i = offset,
+    offset + 2, ...; alternating the offset between rounds lets a tour travel
+    the whole ladder. Returns the number of accepted swaps.
+    """
+    accepted = 0
+    for i in range(offset, len(temps) - 1, 2):
+        x = (1 / temps[i] - 1 / temps[i + 1]) * (energies[i] - energies[i + 1])
+        if x >= 0 or math.exp(x) > rng.random():
+            tours[i], tours[i + 1] = tours[i + 1], tours[i]
+            energies[i], energies[i + 1] = energies[i + 1], energies[i]
+            accepted += 1
+    return accepted
+
+
+def parallel_tempering(cities, t_min, t_max, replicas=None, rounds=100, steps=None,
+                       workers=None, seed=0, k=8):
+    """
+    Replica-exchange annealing over the 2-opt, Or-opt and insertion moves.
+
+    Args:
+        cities (dict): {key: {'x': .., 'y': ..}}, as for simulated_annealing.
+        t_min, t_max (float): Coldest and hottest temperature of the ladder.
+        replicas (int): Number of replicas (default: one per CPU, at least 4).
+        rounds (int): Number of run-then-exchange rounds.
+        steps (int): Moves per replica per round (default: 10 per city).
+        workers (int): Worker processes (default: one per CPU); workers=1 runs
+                       every replica in-process.
+        seed (int): Seed for the replica seeds and the exchange decisions.
+        k (int): Size of the nearest-neighbor candidate lists.
+
+    Returns:
+        tuple: The best tour found (list of city keys) and its length. The
+        global best is also handed back to the coldest replica whenever that
+        replica has drifted above it, so every round continues from it.
+    """
+    city_keys, xs, ys = city_arrays(cities)
+    n = len(city_keys)
+    if n < 4:
+        dist = distance_function(xs, ys)
+        return list(city_keys), tour_length(range(n), dist)
+    workers = workers or os.cpu_count() or 1
+    replicas = replicas or max(4, workers)
+    steps = steps or 10 * n
+    temps = temperature_ladder(t_min, t_max, replicas)
+    rng = random.Random(seed)
+
+    start = strip_tour(xs, ys)
+    tours = [list(start) for _ in temps]
+    energies = [tour_length(start, distance_function(xs, ys))] * replicas
+    best, best_energy = list(start), energies[0]
+    offered = swaps = 0
+
+    if workers == 1:
+        _init_worker(xs, ys, k)
+        pool = None
+        run = lambda *args: list(map(_run_replica, *args))
+    else:
+        pool = ProcessPoolExecutor(min(workers, replicas), initializer=_init_worker,
+                                   initargs=(xs, ys, k))
+        run = lambda *args: pool.map(_run_replica, *args)
+    try:
+        for round_ in range(rounds):
+            seeds = [rng.getrandbits(32) for _ in temps]
+            results = list(run(tours, temps, [steps] * replicas, seeds))
+            for i, (tour, energy, round_best, round_best_energy) in enumerate(results):
+                tours[i], energies[i] = tour, energy
+                if round_best_energy < best_energy:
+                    best, best_energy = round_best, round_best_energy
+            offered += len(range(round_ % 2, replicas - 1, 2))
+            swaps += exchange(tours, energies, temps, round_ % 2, rng)
+            if best_energy < energies[0]:
+                tours[0], energies[0] = list(best), best_energy
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print(f"Replica exchanges accepted: {swaps} of {offered}")
+    return [city_keys[i] for i in best], best_energy
+
+
+# Example Usage:
+#   python tempering.py 2000 --replicas 8 --workers 4
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel tempering for random TSP instances.")
+    parser.add_argument("n", type=int, nargs="?", default=1000, help="number of random cities")
+    parser.add_argument("--replicas", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=None, help="moves per replica per round")
+    parser.add_argument("--t-min", type=float, default=0.5)
+    parser.add_argument("--t-max", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cities = {i: {'x': rng.random() * 1000, 'y': rng.random() * 1000} for i in range(args.n)}
+    started = time.perf_counter()
+    tour, length = parallel_tempering(cities, args.t_min, args.t_max, args.replicas, args.rounds,
+                                      args.steps, args.workers, args.seed)
+    print(f"Best tour length {length:.0f} for {args.n} cities in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,137 @@
+import json
+
+# Trace sinks for the hill-climbing solver. The solver reports what it does as
+# events instead of printing, and the sink decides what (if anything) to do
+# with them:
+#
+#   step(step, board, h)                      a new current state
+#   neighbor(board, col, row, h)              one evaluated neighbor: queen in
+#                                             `col` moved to `row`, with cost h
+#   decision(step, kind, board, h, move, best_h)
+#                                             kind is "goal", "stuck" or "move";
+#                                             for "move", `move` is (col, row)
+#
+# Neighbor events are n * (n - 1) per step, so the solver only sends them to
+# sinks whose `neighbors` attribute is true. Boards passed to a sink are the
+# solver's live board: copy them if you keep them. Sinks given no `out` print
+# to whatever sys.stdout is at the time, so redirect_stdout still captures them.
+
+
+class NullSink:
+    """Drops everything; the solver pays one no-op call per step."""
+
+    neighbors = False
+
+    def step(self, step, board, h):
+        pass
+
+    def neighbor(self, board, col, row, h):
+        pass
+
+    def decision(self, step, kind, board, h, move=None, best_h=None):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def print_board(board, out=None):
+    n = len(board)
+    print("Board Visualization:", file=out)
+    for row in range(n):
+        line = ""
+        for col in range(n):
+            if board[col] == row:
+                line += "Q "
+            else:
+                line += ". "
+        print(line, file=out)
+    print("-" * (2 * n), file=out)
+
+
+class ConsoleSink(NullSink):
+    """The full step-by-step console output: every board and every neighbor."""
+
+    neighbors = True
+
+    def __init__(self, out=None):
+        self.out = out
+        self._first_neighbor = True
+
+    def step(self, step, board, h):
+        out = self.out
+        print(f"\n{'='*10} Step {step} {'='*10}", file=out)
+        print(f"Current State: {board}", file=out)
+        print_board(board, out)
+        print(f"Current Cost (h) = {h}", file=out)
+        self._first_neighbor = True
+
+    def neighbor(self, board, col, row, h):
+        if self._first_neighbor:
+            print("\nEvaluating all neighbor nodes:", file=self.out)
+            self._first_neighbor = False
+        neighbor_board = list(board)
+        neighbor_board[col] = row
+        print(f"  - Neighbor {neighbor_board} -> Cost (h) = {h}", file=self.out)
+
+    def decision(self, step, kind, board, h, move=None, best_h=None):
+        out = self.out
+        if kind == "goal":
+            print("\nGoal configuration reached! No more attacking pairs.", file=out)
+            print("Algorithm terminated successfully.", file=out)
+            return
+        print("-" * 30, file=out)
+        if kind == "stuck":
+            print("Decision: No neighbor has a lower cost.", file=out)
+            print("Stuck at a local minimum. Algorithm cannot proceed.", file=out)
+            return
+        best = list(board)
+        best[move[0]] = move[1]
+        print(f"Decision: The best neighbor is {best} with a cost of {best_h}.", file=out)
+        print(f"Moving to this state as {best_h} < {h}.", file=out)
+
+
+class SampledSink(NullSink):
+    """One summary line every `every` steps, plus the outcome."""
+
+    def __init__(self, every=100, out=None):
+        self.every = every
+        self.out = out
+
+    def step(self, step, board, h):
+        if step % self.every == 0:
+            print(f"step {step}: h = {h}", file=self.out)
+
+    def decision(self, step, kind, board, h, move=None, best_h=None):
+        if kind != "move":
+            print(f"step {step}: {kind}, h = {h}", file=self.out)
+
+
+class JsonLinesSink(NullSink):
+    """
+    Every event as one JSON object per line, written through a large buffer.
+    Set neighbors=False to keep only step and decision events.
+    """
+
+    def __init__(self, path, neighbors=True, buffer_size=1 << 20):
+        self.neighbors = neighbors
+        self.file = open(path, "w", buffering=buffer_size)
+
+    def step(self, step, board, h):
+        self.file.write(json.dumps({"event": "step", "step": step, "board": board, "h": h}) + "\n")
+
+    def neighbor(self, board, col, row, h):
+        self.file.write(json.dumps({"event": "neighbor", "col": col, "row": row, "h": h}) + "\n")
+
+    def decision(self, step, kind, board, h, move=None, best_h=None):
+        self.file.write(json.dumps({"event": "decision", "step": step, "kind": kind,
+                                    "h": h, "move": move, "best_h": best_h}) + "\n")
+
+    def close(self):
+        self.file.close()
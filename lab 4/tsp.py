@@ -0,0 +1,146 @@
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: distances are then computed on the fly
+    np = None
+
+# Shared TSP helpers for the simulated annealing solver. Cities are held as two
+# contiguous coordinate arrays and a tour is a list of positions into them, so
+# the inner loop never touches the {index: {'x': .., 'y': ..}} dicts.
+
+# Largest instance for which a full distance matrix is precomputed
+MATRIX_LIMIT = 1000
+
+# TSPLIB's GEO constants (TSPLIB 95, section 2.4)
+GEO_PI = 3.141592
+GEO_RADIUS = 6378.388
+
+
+class CityArrays:
+    """
+    Cities stored directly as contiguous arrays, as produced by tsplib.py:
+    city i has key keys[i] and coordinates (xs[i], ys[i]). `metric` is one of
+    "EUCLIDEAN" (plain floating-point distances, as for the dict format),
+    TSPLIB's rounded "EUC_2D", "ATT" and "GEO" (xs and ys then hold latitude
+    and longitude in radians), or "EXPLICIT", where `weights` is the full n * n
+    distance matrix in row-major order and the coordinates may be empty.
+    """
+
+    __slots__ = ("keys", "xs", "ys", "metric", "weights", "name", "_distances")
+
+    def __init__(self, xs, ys, metric="EUCLIDEAN", weights=None, first_key=0, name=None):
+        self.xs = xs
+        self.ys = ys
+        self.metric = metric
+        self.weights = weights
+        n = len(xs) if weights is None else math.isqrt(len(weights))
+        self.keys = range(first_key, first_key + n)
+        self.name = name
+        self._distances = {}  # matrix_limit -> distance function, built on first use
+
+    def __len__(self):
+        return len(self.keys)
+
+    def position(self, key):
+        """The position of the city with this key (keys are consecutive from first_key)."""
+        return key - self.keys.start
+
+    def distance_function(self, matrix_limit=MATRIX_LIMIT):
+        """
+        dist(a, b) between city positions a and b under this instance's metric.
+        Built once per instance (the EUCLIDEAN matrix is O(n^2)) and reused.
+        """
+        if matrix_limit not in self._distances:
+            self._distances[matrix_limit] = self._make_distance(matrix_limit)
+        return self._distances[matrix_limit]
+
+    def _make_distance(self, matrix_limit):
+        xs, ys = self.xs, self.ys
+        if self.metric == "EUCLIDEAN":
+            return distance_function(xs, ys, matrix_limit)
+        if self.metric == "EXPLICIT":
+            weights, n = self.weights, len(self.keys)
+            return lambda a, b: weights[a * n + b]
+        hypot = math.hypot
+        if self.metric == "EUC_2D":
+            return lambda a, b: int(hypot(xs[a] - xs[b], ys[a] - ys[b]) + 0.5)
+        if self.metric == "ATT":
+            def att(a, b):
+                r = hypot(xs[a] - xs[b], ys[a] - ys[b]) / math.sqrt(10)
+                t = int(r + 0.5)
+                return t + 1 if t < r else t
+            return att
+        if self.metric == "GEO":
+            cos, acos = math.cos, math.acos
+
+            def geo(a, b):
+                if a == b:
+                    return 0
+                q1 = cos(ys[a] - ys[b])
+                q2 = cos(xs[a] - xs[b])
+                q3 = cos(xs[a] + xs[b])
+                return int(GEO_RADIUS * acos(0.5 * ((1 + q1) * q2 - (1 - q1) * q3)) + 1)
+            return geo
+        raise ValueError(f"unknown metric {self.metric!r}")
+
+
+def city_arrays(cities):
+    """
+    Split a {key: {'x': .., 'y': ..}} dict into (keys, xs, ys); a CityArrays
+    instance is returned as its own arrays without copying.
+    """
+    if isinstance(cities, CityArrays):
+        return cities.keys, cities.xs, cities.ys
+    keys = list(cities.keys())
+    xs = array('d', (cities[k]['x'] for k in keys))
+    ys = array('d', (cities[k]['y'] for k in keys))
+    return keys, xs, ys
+
+
+def distance_function(xs, ys, matrix_limit=MATRIX_LIMIT):
+    """
+    dist(a, b) between city positions a and b. Up to `matrix_limit` cities (and
+    with NumPy installed) the distances are precomputed into a matrix, stored as
+    nested lists because indexing those from Python is cheaper than indexing an
+    ndarray element by element; otherwise they come straight from the coordinates.
+    """
+    n = len(xs)
+    if np is not None and n <= matrix_limit:
+        x = np.asarray(xs)
+        y = np.asarray(ys)
+        matrix = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :]).tolist()
+        return lambda a, b: matrix[a][b]
+    hypot = math.hypot
+    return lambda a, b: hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+
+def city_distance(cities, xs, ys):
+    """dist(a, b) for either city format, with xs and ys from city_arrays(cities)."""
+    if isinstance(cities, CityArrays):
+        return cities.distance_function()
+    return distance_function(xs, ys)
+
+
+def tour_length(tour, dist):
+    n = len(tour)
+    return sum(dist(tour[i], tour[(i + 1) % n]) for i in range(n))
+
+
+def swap_cities(tour, i, j, dist):
+    """
+    Swap the cities at tour positions i and j in place and return the change in
+    tour length. Only the (at most four) edges touching the two positions are
+    re-measured, so this is O(1); calling it again with the same i, j undoes it.
+    """
+    n = len(tour)
+    edges = {(i - 1) % n, i, (j - 1) % n, j}  # an edge p runs from tour[p] to tour[p + 1]
+    before = 0.0
+    for p in edges:
+        before += dist(tour[p], tour[(p + 1) % n])
+    tour[i], tour[j] = tour[j], tour[i]
+    after = 0.0
+    for p in edges:
+        after += dist(tour[p], tour[(p + 1) % n])
+    return after - before
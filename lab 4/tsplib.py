@@ -0,0 +1,184 @@
+import csv
+import sys
+import time
+from array import array
+from itertools import islice
+
+from tsp import GEO_PI, CityArrays
+
+# Loaders for TSPLIB .tsp files and CSV coordinate files. Both read their input
+# one line at a time straight into preallocated array('d') buffers (8 bytes per
+# value), so memory stays flat however large the file is, and both return a
+# CityArrays that calculate_total_distance and simulated_annealing accept in
+# place of the {key: {'x': .., 'y': ..}} dict.
+#
+# Supported TSPLIB edge weight types: EUC_2D, ATT, GEO and EXPLICIT (all
+# FULL_MATRIX / *_ROW / *_COL formats). City keys are the TSPLIB node numbers,
+# 1 to n; CSV rows are keyed 0 to n - 1.
+
+EDGE_WEIGHT_TYPES = ("EUC_2D", "ATT", "GEO", "EXPLICIT")
+
+
+def _zeros(n):
+    return array('d', bytes(8 * n))
+
+
+def _geo_radians(value):
+    # TSPLIB GEO coordinates are DDD.MM (degrees and minutes)
+    degrees = int(value)
+    return GEO_PI * (degrees + 5.0 * (value - degrees) / 3.0) / 180.0
+
+
+def _matrix_cells(n, form):
+    """The (row, col) cells of an n x n matrix in the order `form` lists them."""
+    if form == "FULL_MATRIX":
+        return ((i, j) for i in range(n) for j in range(n))
+    # A column-wise triangle lists the same cells as the opposite row-wise one
+    form = {"LOWER_COL": "UPPER_ROW", "UPPER_COL": "LOWER_ROW",
+            "LOWER_DIAG_COL": "UPPER_DIAG_ROW", "UPPER_DIAG_COL": "LOWER_DIAG_ROW"}.get(form, form)
+    if form == "UPPER_ROW":
+        return ((i, j) for i in range(n) for j in range(i + 1, n))
+    if form == "LOWER_ROW":
+        return ((i, j) for i in range(n) for j in range(i))
+    if form == "UPPER_DIAG_ROW":
+        return ((i, j) for i in range(n) for j in range(i, n))
+    if form == "LOWER_DIAG_ROW":
+        return ((i, j) for i in range(n) for j in range(i + 1))
+    raise ValueError(f"unsupported EDGE_WEIGHT_FORMAT {form!r}")
+
+
+def _numbers(lines):
+    for line in lines:
+        for token in line.split():
+            yield float(token)
+
+
+def _read_coordinates(lines, n, xs, ys, geo):
+    for line in islice(lines, n):
+        node, x, y = line.split()[:3]
+        i = int(node) - 1
+        x, y = float(x), float(y)
+        if geo:
+            x, y = _geo_radians(x), _geo_radians(y)
+        xs[i] = x
+        ys[i] = y
+
+
+def _read_weights(lines, n, form):
+    weights = _zeros(n * n)
+    values = _numbers(lines)
+    if form == "FULL_MATRIX":
+        for (i, j), value in zip(_matrix_cells(n, form), values):
+            weights[i * n + j] = value
+    else:
+        # A triangle gives each pair once; mirror it into the other half
+        for (i, j), value in zip(_matrix_cells(n, form), values):
+            weights[i * n + j] = value
+            weights[j * n + i] = value
+    return weights
+
+
+def _is_symmetric(weights, n):
+    return all(weights[i * n + j] == weights[j * n + i] for i in range(n) for j in range(i))
+
+
+def load_tsp(path):
+    """Load a TSPLIB .tsp file into a CityArrays."""
+    header = {}
+    xs = ys = weights = None
+    with open(path) as lines:
+        for line in lines:
+            line = line.strip()
+            if line == "EOF":
+                break
+            if not line:
+                continue
+            if ":" in line:
+                key, value = line.split(":", 1)
+                header[key.strip().upper()] = value.strip()
+                continue
+
+            section = line.upper()
+            n = int(header["DIMENSION"])
+            kind = header.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper()
+            if kind not in EDGE_WEIGHT_TYPES:
+                raise ValueError(f"{path}: unsupported EDGE_WEIGHT_TYPE {kind}")
+            if section == "NODE_COORD_SECTION":
+                xs, ys = _zeros(n), _zeros(n)
+                _read_coordinates(lines, n, xs, ys, kind == "GEO")
+            elif section == "EDGE_WEIGHT_SECTION":
+                form = header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper()
+                weights = _read_weights(lines, n, form)
+                if form == "FULL_MATRIX" and not _is_symmetric(weights, n):
+                    # The solvers' move deltas assume dist(a, b) == dist(b, a)
+                    raise ValueError(f"{path}: asymmetric EDGE_WEIGHT_SECTION (only the symmetric TSP "
+                                     f"is supported)")
+            elif section == "DISPLAY_DATA_SECTION":
+                # Drawing coordinates, kept only for instances that have no others
+                if xs is None:
+                    xs, ys = _zeros(n), _zeros(n)
+                    _read_coordinates(lines, n, xs, ys, False)
+                else:
+                    for _ in islice(lines, n):
+                        pass
+            else:
+                raise ValueError(f"{path}: unsupported section {line}")
+
+    kind = header.get("EDGE_WEIGHT_TYPE", "EUC_2D").upper()
+    if (weights if kind == "EXPLICIT" else xs) is None:
+        raise ValueError(f"{path}: no data for EDGE_WEIGHT_TYPE {kind}")
+    if xs is None:
+        xs, ys = array('d'), array('d')
+    return CityArrays(xs, ys, kind, weights, first_key=1, name=header.get("NAME"))
+
+
+def load_csv(path, x="x", y="y", metric="EUCLIDEAN"):
+    """
+    Load city coordinates from a CSV file. If the first row is a header, the
+    coordinates are taken from the columns named `x` and `y`; otherwise from
+    the first two columns.
+    """
+    xs, ys = array('d'), array('d')
+    with open(path, newline="") as f:
+        rows = csv.reader(f)
+        first = next(rows, None)
+        if first is None:
+            return CityArrays(xs, ys, metric)
+        try:
+            point = float(first[0]), float(first[1])
+        except ValueError:
+            point = None
+        if point is not None:
+            xs.append(point[0])
+            ys.append(point[1])
+            xi, yi = 0, 1
+        else:
+            names = [name.strip() for name in first]
+            if x not in names or y not in names:
+                raise ValueError(f"{path}: no {x!r} and {y!r} columns in header {names}")
+            xi, yi = names.index(x), names.index(y)
+        for row in rows:
+            if row:
+                xs.append(float(row[xi]))
+                ys.append(float(row[yi]))
+    return CityArrays(xs, ys, metric)
+
+
+def load(path):
+    """Load a .tsp or .csv file, chosen by its extension."""
+    if path.lower().endswith(".csv"):
+        return load_csv(path)
+    return load_tsp(path)
+
+
+# Example Usage:
+#   python tsplib.py berlin52.tsp
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        started = time.perf_counter()
+        cities = load(path)
+        elapsed = time.perf_counter() - started
+        arrays = [cities.xs, cities.ys] + ([cities.weights] if cities.weights is not None else [])
+        size = sum(a.itemsize * len(a) for a in arrays)
+        print(f"{path}: {len(cities)} cities, {cities.metric}, "
+              f"{size / 1e6:.1f} MB of arrays, loaded in {elapsed:.2f}s")
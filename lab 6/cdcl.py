@@ -0,0 +1,340 @@
+import heapq
+
+# A small conflict-driven clause learning (CDCL) SAT solver.
+#
+# Variables are numbered from 1 and literals are DIMACS-style integers: v for
+# "v is true", -v for "v is false". Internally a literal is the code
+# 2 * v + (1 if negated else 0), so its negation is code ^ 1 and both
+# polarities of a variable index flat lists directly.
+#
+#   two watched literals   every clause of two or more literals watches its
+#                          first two; only clauses watching a literal that
+#                          just became false are visited during propagation
+#   VSIDS                  variables in learned clauses have their activity
+#                          bumped; decisions take the most active variable,
+#                          using its last assigned polarity (phase saving)
+#   clause learning        conflicts are analysed to the first unique implication
+#                          point, the learned clause is minimized and the
+#                          search jumps back to its second-highest level
+#   restarts               on the Luby sequence (times RESTART_BASE conflicts)
+#   clause deletion        when there are too many learned clauses, the half
+#                          with the worst LBD (distinct levels in the clause) goes
+
+RESTART_BASE = 100
+VAR_DECAY = 0.95
+
+
+def luby(i):
+    """The i-th term (from 0) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ..."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        size = 2 * size + 1
+        exponent += 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i %= size
+    return 1 << exponent
+
+
+class Solver:
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []       # clause index -> list of literal codes, or None once deleted
+        self.learned = []       # indices of learned clauses
+        self.lbd = {}           # learned clause index -> LBD
+        self.watches = [[], []]  # literal code -> indices of clauses watching it
+        self.value = [0, 0]     # literal code -> 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]    # var -> index of the clause that implied it
+        self.activity = [0.0]
+        self.phase = [False]
+        self.heap = []          # (-activity, var), possibly stale; see _pick
+        self.trail = []
+        self.trail_lim = []     # trail length at the start of each decision level
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.ok = True          # False once the clauses are known to be unsatisfiable
+        self.model = None
+        self.max_learned = 2000
+        self.stats = {"decisions": 0, "propagations": 0, "conflicts": 0, "restarts": 0,
+                      "learned": 0, "deleted": 0}
+
+    # --- Building the problem ---
+
+    def new_var(self):
+        self.num_vars += 1
+        v = self.num_vars
+        self.watches += [[], []]
+        self.value += [0, 0]
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        heapq.heappush(self.heap, (0.0, v))
+        return v
+
+    def add_clause(self, clause):
+        """
+        Add a clause given as DIMACS literals. Returns False if the solver is
+        now known to be unsatisfiable. Clauses may be added between calls to
+        solve(); learned clauses are kept.
+        """
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        lits = []
+        for lit in clause:
+            v = abs(lit)
+            while v > self.num_vars:
+                self.new_var()
+            code = 2 * v + (lit < 0)
+            value = self.value[code]
+            if value == 1 or code ^ 1 in lits:
+                return True  # satisfied at level 0, or a tautology
+            if value == 0 and code not in lits:
+                lits.append(code)
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self._enqueue(lits[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self._attach(lits)
+        return self.ok
+
+    def _attach(self, lits):
+        index = len(self.clauses)
+        self.clauses.append(lits)
+        self.watches[lits[0]].append(index)
+        self.watches[lits[1]].append(index)
+        return index
+
+    # --- Search ---
+
+    def _enqueue(self, code, reason):
+        v = code >> 1
+        self.value[code] = 1
+        self.value[code ^ 1] = -1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(code)
+
+    def _propagate(self):
+        """Unit propagation from qhead; returns the index of a conflicting clause or None."""
+        value, watches, clauses, trail = self.value, self.watches, self.clauses, self.trail
+        propagations = 0
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            propagations += 1
+            watching = watches[false_lit]
+            kept = []
+            i, n = 0, len(watching)
+            while i < n:
+                index = watching[i]
+                i += 1
+                c = clauses[index]
+                if c is None:
+                    continue  # deleted
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], false_lit
+                first = c[0]
+                if value[first] == 1:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(c)):
+                    if value[c[k]] != -1:
+                        c[1], c[k] = c[k], false_lit
+                        watches[c[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if value[first] == -1:
+                        kept.extend(watching[i:])
+                        watches[false_lit] = kept
+                        self.qhead = len(trail)
+                        self.stats["propagations"] += propagations
+                        return index
+                    self._enqueue(first, index)
+            watches[false_lit] = kept
+        self.stats["propagations"] += propagations
+        return None
+
+    def _bump(self, v):
+        self.activity[v] += self.var_inc
+        if self.activity[v] > 1e100:
+            for u in range(1, self.num_vars + 1):
+                self.activity[u] *= 1e-100
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, self.num_vars + 1)
+                         if self.value[2 * u] == 0]
+            heapq.heapify(self.heap)
+        elif self.value[2 * v] == 0:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def _analyze(self, conflict):
+        """First-UIP learning: returns (learned clause, backjump level, LBD)."""
+        level, reason, clauses, trail = self.level, self.reason, self.clauses, self.trail
+        current = len(self.trail_lim)
+        seen = set()
+        learned = [None]
+        pending = 0
+        implied = None
+        index = len(trail) - 1
+        clause = clauses[conflict]
+        while True:
+            for code in (clause if implied is None else clause[1:]):
+                v = code >> 1
+                if v not in seen and level[v] > 0:
+                    seen.add(v)
+                    self._bump(v)
+                    if level[v] == current:
+                        pending += 1
+                    else:
+                        learned.append(code)
+            while trail[index] >> 1 not in seen:
+                index -= 1
+            implied = trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = clauses[reason[implied >> 1]]
+        learned[0] = implied ^ 1
+
+        # Drop literals implied by the rest of the clause (local minimization)
+        in_clause = {code >> 1 for code in learned}
+        minimized = [learned[0]]
+        for code in learned[1:]:
+            r = reason[code >> 1]
+            if r is None or any(other >> 1 not in in_clause and level[other >> 1] > 0
+                                for other in clauses[r][1:]):
+                minimized.append(code)
+        learned = minimized
+
+        if len(learned) == 1:
+            return learned, 0, 1
+        # Watch the literal from the highest level below the current one
+        best = max(range(1, len(learned)), key=lambda k: level[learned[k] >> 1])
+        learned[1], learned[best] = learned[best], learned[1]
+        lbd = len({level[code >> 1] for code in learned})
+        return learned, level[learned[1] >> 1], lbd
+
+    def _cancel_until(self, target):
+        if len(self.trail_lim) <= target:
+            return
+        value, phase, trail = self.value, self.phase, self.trail
+        start = self.trail_lim[target]
+        for code in trail[start:]:
+            v = code >> 1
+            value[code] = value[code ^ 1] = 0
+            phase[v] = not code & 1
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del trail[start:]
+        del self.trail_lim[target:]
+        self.qhead = start
+        if len(self.heap) > 4 * self.num_vars:
+            self.heap = [(-self.activity[u], u) for u in range(1, self.num_vars + 1)
+                         if self.value[2 * u] == 0]
+            heapq.heapify(self.heap)
+
+    def _pick(self):
+        # Stale heap entries (assigned, or superseded by a later bump) are skipped
+        value, heap = self.value, self.heap
+        while heap:
+            _, v = heapq.heappop(heap)
+            if value[2 * v] == 0:
+                return 2 * v + (not self.phase[v])
+        return None
+
+    def _reduce(self):
+        # Keep clauses that are reasons for current assignments
+        locked = {self.reason[code >> 1] for code in self.trail}
+        candidates = sorted((i for i in self.learned if i not in locked and self.lbd[i] > 2),
+                            key=lambda i: self.lbd[i], reverse=True)
+        for i in candidates[:len(candidates) // 2]:
+            self.clauses[i] = None
+            del self.lbd[i]
+        self.stats["deleted"] += len(candidates) // 2
+        self.learned = [i for i in self.learned if self.clauses[i] is not None]
+        self.max_learned = int(self.max_learned * 1.1)
+
+    def solve(self, assumptions=()):
+        """
+        Decide satisfiability, with the DIMACS literals in `assumptions` taken
+        as true for this call only. On True, self.model[v] is the value of
+        variable v (self.model[0] is unused).
+
+        Assumptions are made as the first decisions rather than added as
+        clauses, so everything learned stays valid for later calls and an
+        unsatisfiable answer under assumptions leaves the solver usable.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+        for lit in assumptions:
+            while abs(lit) > self.num_vars:
+                self.new_var()
+        assumed = [2 * abs(lit) + (lit < 0) for lit in assumptions]
+
+        restarts = 0
+        budget = RESTART_BASE * luby(restarts)
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learned, backjump, lbd = self._analyze(conflict)
+                self._cancel_until(backjump)
+                if len(learned) == 1:
+                    self._enqueue(learned[0], None)
+                else:
+                    index = self._attach(learned)
+                    self.learned.append(index)
+                    self.lbd[index] = lbd
+                    self._enqueue(learned[0], index)
+                self.stats["learned"] += 1
+                self.var_inc /= VAR_DECAY
+                continue
+
+            if conflicts >= budget:
+                restarts += 1
+                self.stats["restarts"] += 1
+                budget = RESTART_BASE * luby(restarts)
+                conflicts = 0
+                self._cancel_until(0)
+                continue
+            if len(self.learned) >= self.max_learned:
+                self._reduce()
+
+            # Assumptions first, one decision level each (empty if already true)
+            code = None
+            while code is None and len(self.trail_lim) < len(assumed):
+                a = assumed[len(self.trail_lim)]
+                if self.value[a] == -1:
+                    self._cancel_until(0)  # the clauses imply the assumption is false
+                    return False
+                if self.value[a] == 0:
+                    code = a
+                else:
+                    self.trail_lim.append(len(self.trail))
+            if code is None:
+                code = self._pick()
+                if code is None:
+                    self.model = [False] + [self.value[2 * v] == 1
+                                            for v in range(1, self.num_vars + 1)]
+                    self._cancel_until(0)
+                    return True
+                self.stats["decisions"] += 1
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(code, None)
@@ -0,0 +1,150 @@
+from cdcl import Solver
+from formula import (And, BooleanFalse, BooleanTrue, Equivalent, Implies, Not, Or, Symbol,
+                     as_formula)
+
+# Entailment by refutation: KB entails alpha exactly when KB & ~alpha has no
+# model. The formula is turned into clauses with the Tseitin transform, which
+# gives every compound subformula its own variable x and clauses stating
+# x <-> (subformula), so the clause count grows linearly with the formula
+# instead of exponentially as with distributing Or over And. The clauses go to
+# the CDCL solver in cdcl.py; any model it finds is a counter-model.
+
+
+class Encoder:
+    """Tseitin-encodes formulas (see formula.py) into the clauses of a Solver."""
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.symbols = {}  # Symbol -> variable
+        self.cache = {}    # compound subformula -> literal standing for it
+        self.true = None   # variable forced true, for the constants
+
+    def literal(self, expr):
+        """A literal equivalent to `expr`, adding the defining clauses once per subformula."""
+        if isinstance(expr, Symbol):
+            if expr not in self.symbols:
+                self.symbols[expr] = self.solver.new_var()
+            return self.symbols[expr]
+        if isinstance(expr, (BooleanTrue, BooleanFalse)):
+            if self.true is None:
+                self.true = self.solver.new_var()
+                self.solver.add_clause([self.true])
+            return self.true if isinstance(expr, BooleanTrue) else -self.true
+        if isinstance(expr, Not):
+            return -self.literal(expr.args[0])
+        if expr in self.cache:
+            return self.cache[expr]
+
+        add = self.solver.add_clause
+        if isinstance(expr, Implies):
+            lits = [-self.literal(expr.args[0]), self.literal(expr.args[1])]
+            kind = Or
+        elif isinstance(expr, (And, Or)):
+            lits = [self.literal(arg) for arg in expr.args]
+            kind = type(expr)
+        elif isinstance(expr, Equivalent):
+            args = [self.literal(arg) for arg in expr.args]
+            x = self.solver.new_var()
+            # x -> every argument equals the next; ~x -> some pair differs
+            for a, b in zip(args, args[1:]):
+                add([-x, -a, b])
+                add([-x, a, -b])
+            add([x] + [-a for a in args])
+            add([x] + args)
+            self.cache[expr] = x
+            return x
+        else:
+            raise TypeError(f"unsupported connective: {type(expr).__name__}")
+
+        x = self.solver.new_var()
+        if kind is And:
+            for a in lits:
+                add([-x, a])
+            add([x] + [-a for a in lits])
+        else:
+            for a in lits:
+                add([x, -a])
+            add([-x] + lits)
+        self.cache[expr] = x
+        return x
+
+    def add(self, expr):
+        """Assert `expr`. Top-level conjunctions and clauses are added without new variables."""
+        if isinstance(expr, And):
+            for arg in expr.args:
+                self.add(arg)
+        elif isinstance(expr, Or):
+            self.solver.add_clause([self.literal(arg) for arg in expr.args])
+        elif isinstance(expr, Implies):
+            self.solver.add_clause([-self.literal(expr.args[0]), self.literal(expr.args[1])])
+        else:
+            self.solver.add_clause([self.literal(expr)])
+
+    def model(self):
+        """The solver's last model restricted to the formula's symbols."""
+        return {symbol: self.solver.model[v] for symbol, v in self.symbols.items()}
+
+
+class EntailmentResult:
+    """
+    True iff the KB entails the query; otherwise carries a counter-model.
+    `models` is the number of models of the KB when the method counts them.
+    """
+
+    def __init__(self, entailed, counter_model=None, models=None):
+        self.entailed = entailed
+        self.counter_model = counter_model
+        self.models = models
+
+    def __bool__(self):
+        return self.entailed
+
+    def __repr__(self):
+        fields = [f"entailed={self.entailed}"]
+        if not self.entailed:
+            fields.append(f"counter_model={self.counter_model}")
+        if self.models is not None:
+            fields.append(f"models={self.models}")
+        return f"EntailmentResult({', '.join(fields)})"
+
+
+class KnowledgeBase:
+    """
+    A KB kept as clauses in one solver across queries. Sentences are encoded
+    once, when told; ask() encodes just the query (reusing any subformula
+    already seen) and solves with its negation as an assumption, so the
+    clause database is never changed by a query and everything learned while
+    answering one query speeds up the next.
+    """
+
+    def __init__(self, *sentences):
+        self.solver = Solver()
+        self.encoder = Encoder(self.solver)
+        self.sentences = []
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Add a sentence (fact or rule) to the KB; sympy expressions are converted."""
+        sentence = as_formula(sentence)
+        self.sentences.append(sentence)
+        self.encoder.add(sentence)
+
+    def formula(self):
+        """The KB as a single conjunction."""
+        return And(*self.sentences)
+
+    def ask(self, query):
+        """
+        Decide whether the KB entails `query`. Returns an EntailmentResult; when
+        the answer is no, its counter_model maps every symbol of the KB and the
+        query to a value that makes the KB true and the query false.
+        """
+        if self.solver.solve([-self.encoder.literal(as_formula(query))]):
+            return EntailmentResult(False, self.encoder.model())
+        return EntailmentResult(True)
+
+
+def entails(kb, query):
+    """One-off check of whether the sentence `kb` entails `query`."""
+    return KnowledgeBase(kb).ask(query)
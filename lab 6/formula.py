@@ -0,0 +1,345 @@
+import itertools
+import re
+import weakref
+
+# A small native representation of propositional formulas, standing in for
+# sympy's Symbol / And / Or / Not / Implies / Equivalent in the lab code.
+#
+# Every node is interned (hash-consed): building the same formula twice gives
+# the very same object, so repeated subformulas are shared, equality is an
+# identity test and the hash is computed once, at construction. Like sympy,
+# And and Or flatten nested arguments, drop duplicates and put their
+# arguments in a canonical order, and constants are simplified away, so
+# And(P, Q) and And(Q, P) are the same node. NNF and CNF are memoized on
+# each node.
+#
+# sympy itself is only imported by to_sympy() and from_sympy(), so scripts
+# that stick to this module start without it.
+
+_interned = weakref.WeakValueDictionary()  # (class, args or name) -> node
+_serial = itertools.count()                # creation order, for canonical argument order
+
+
+class Formula:
+    __slots__ = ("args", "_hash", "_order", "_free", "_nnf", "_cnf", "__weakref__")
+
+    compound = False  # printed in parentheses inside other connectives
+
+    @classmethod
+    def _intern(cls, args):
+        key = (cls, args)
+        node = _interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.args = args
+            node._hash = hash(key)
+            node._order = next(_serial)
+            node._free = node._nnf = node._cnf = None
+            _interned[key] = node
+        return node
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return self is other
+
+    def __repr__(self):
+        return str(self)
+
+    def __reduce__(self):
+        # Unpickled nodes go through the constructor, so they are interned again
+        return (type(self), self.args)
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def __rshift__(self, other):
+        return Implies(self, other)
+
+    @property
+    def free_symbols(self):
+        if self._free is None:
+            self._free = frozenset().union(*(arg.free_symbols for arg in self.args))
+        return self._free
+
+    def _wrap(self, arg):
+        return f"({arg})" if arg.compound else str(arg)
+
+    # --- Normal forms ---
+
+    def to_nnf(self):
+        """Negation normal form: only And, Or and negated symbols."""
+        if self._nnf is None:
+            self._nnf = self._make_nnf(False), self._make_nnf(True)
+        return self._nnf[0]
+
+    def _nnf_of(self, negated):
+        self.to_nnf()
+        return self._nnf[negated]
+
+    def to_cnf(self):
+        """Conjunctive normal form, by distributing Or over And (exponential in the worst case)."""
+        if self._cnf is None:
+            nnf = self.to_nnf()
+            self._cnf = self._make_cnf() if nnf is self else nnf.to_cnf()
+        return self._cnf
+
+    def _make_cnf(self):
+        # Only called on formulas already in NNF; literals are their own CNF
+        return self
+
+
+class BooleanTrue(Formula):
+    __slots__ = ()
+
+    def __new__(cls):
+        return cls._intern(())
+
+    def __str__(self):
+        return "True"
+
+    def _make_nnf(self, negated):
+        return false if negated else self
+
+
+class BooleanFalse(Formula):
+    __slots__ = ()
+
+    def __new__(cls):
+        return cls._intern(())
+
+    def __str__(self):
+        return "False"
+
+    def _make_nnf(self, negated):
+        return true if negated else self
+
+
+true = BooleanTrue()
+false = BooleanFalse()
+
+
+class Symbol(Formula):
+    __slots__ = ()
+
+    def __new__(cls, name):
+        return cls._intern(name)
+
+    @property
+    def name(self):
+        return self.args
+
+    @property
+    def free_symbols(self):
+        return frozenset((self,))
+
+    def __reduce__(self):
+        return (Symbol, (self.args,))
+
+    def __str__(self):
+        return self.args
+
+    def _make_nnf(self, negated):
+        return Not(self) if negated else self
+
+
+class Not(Formula):
+    __slots__ = ()
+
+    def __new__(cls, arg):
+        if isinstance(arg, Not):
+            return arg.args[0]
+        if arg is true:
+            return false
+        if arg is false:
+            return true
+        return cls._intern((arg,))
+
+    def __str__(self):
+        return "~" + self._wrap(self.args[0])
+
+    def _make_nnf(self, negated):
+        return self.args[0]._nnf_of(not negated)
+
+
+class _Junction(Formula):
+    # And / Or: `identity` is dropped from the arguments, `absorbing` absorbs them
+    __slots__ = ()
+    compound = True
+
+    def __new__(cls, *args):
+        flat = {}
+        for arg in args:
+            for a in (arg.args if type(arg) is cls else (arg,)):
+                if a is cls.absorbing:
+                    return a
+                if a is not cls.identity:
+                    flat[a] = None
+        for a in flat:
+            if Not(a) in flat:
+                return cls.absorbing  # contains both a and ~a
+        if not flat:
+            return cls.identity
+        if len(flat) == 1:
+            return next(iter(flat))
+        return cls._intern(tuple(sorted(flat, key=lambda a: a._order)))
+
+    def __str__(self):
+        return f" {self.symbol} ".join(self._wrap(arg) for arg in self.args)
+
+
+class And(_Junction):
+    __slots__ = ()
+    symbol = "&"
+
+    def _make_nnf(self, negated):
+        if negated:
+            return Or(*(arg._nnf_of(True) for arg in self.args))
+        return And(*(arg._nnf_of(False) for arg in self.args))
+
+    def _make_cnf(self):
+        return And(*(arg.to_cnf() for arg in self.args))
+
+
+class Or(_Junction):
+    __slots__ = ()
+    symbol = "|"
+
+    def _make_nnf(self, negated):
+        if negated:
+            return And(*(arg._nnf_of(True) for arg in self.args))
+        return Or(*(arg._nnf_of(False) for arg in self.args))
+
+    def _make_cnf(self):
+        # Every way of picking one clause from each argument's CNF
+        conjuncts = [arg.to_cnf() for arg in self.args]
+        clause_sets = [c.args if isinstance(c, And) else (c,) for c in conjuncts]
+        return And(*(Or(*picked) for picked in itertools.product(*clause_sets)))
+
+
+And.identity, And.absorbing = true, false
+Or.identity, Or.absorbing = false, true
+
+
+class Implies(Formula):
+    __slots__ = ()
+    compound = True
+
+    def __new__(cls, a, b):
+        if a is false or b is true or a is b:
+            return true
+        if a is true:
+            return b
+        if b is false:
+            return Not(a)
+        return cls._intern((a, b))
+
+    def __str__(self):
+        return f"Implies({self.args[0]}, {self.args[1]})"
+
+    def _make_nnf(self, negated):
+        a, b = self.args
+        if negated:
+            return And(a._nnf_of(False), b._nnf_of(True))
+        return Or(a._nnf_of(True), b._nnf_of(False))
+
+
+class Equivalent(Formula):
+    __slots__ = ()
+    compound = True
+
+    def __new__(cls, *args):
+        unique = tuple(sorted(set(args), key=lambda a: a._order))
+        if len(unique) == 1:
+            return true
+        return cls._intern(unique)
+
+    def __str__(self):
+        return f"Equivalent({', '.join(map(str, self.args))})"
+
+    def _make_nnf(self, negated):
+        # All equal: all true or all false
+        all_true = And(*(arg._nnf_of(False) for arg in self.args))
+        all_false = And(*(arg._nnf_of(True) for arg in self.args))
+        if negated:
+            return And(all_true._nnf_of(True), all_false._nnf_of(True))
+        return Or(all_true, all_false)
+
+
+def symbols(names):
+    """
+    Symbols from a string, as with sympy: 'P, Q, R' or 'P Q R', with 'p0:3'
+    standing for p0, p1, p2. Returns a tuple (a single Symbol for one name).
+    """
+    result = []
+    for name in re.split(r"[\s,]+", names.strip()):
+        if not name:
+            continue
+        ranged = re.fullmatch(r"(\w*?)(\d*):(\d+)", name)
+        if ranged:
+            prefix, start, stop = ranged.groups()
+            result.extend(Symbol(f"{prefix}{i}") for i in range(int(start or 0), int(stop)))
+        else:
+            result.append(Symbol(name))
+    return result[0] if len(result) == 1 else tuple(result)
+
+
+# --- sympy backend ---
+
+_TO_SYMPY = {And: "And", Or: "Or", Not: "Not", Implies: "Implies", Equivalent: "Equivalent"}
+
+
+def to_sympy(formula):
+    """The same formula as a sympy expression (imports sympy)."""
+    import sympy
+    from sympy.logic import boolalg
+
+    cache = {}
+
+    def convert(node):
+        if node not in cache:
+            if isinstance(node, Symbol):
+                cache[node] = sympy.Symbol(node.name)
+            elif node is true or node is false:
+                cache[node] = sympy.true if node is true else sympy.false
+            else:
+                cache[node] = getattr(boolalg, _TO_SYMPY[type(node)])(*map(convert, node.args))
+        return cache[node]
+
+    return convert(formula)
+
+
+def from_sympy(expr):
+    """A native formula from a sympy expression."""
+    from sympy.logic import boolalg
+
+    kinds = {getattr(boolalg, name): kind for kind, name in _TO_SYMPY.items()}
+    cache = {}
+
+    def convert(e):
+        if e not in cache:
+            if e.is_Symbol:
+                cache[e] = Symbol(e.name)
+            elif isinstance(e, boolalg.BooleanTrue):
+                cache[e] = true
+            elif isinstance(e, boolalg.BooleanFalse):
+                cache[e] = false
+            elif type(e) in kinds:
+                cache[e] = kinds[type(e)](*map(convert, e.args))
+            else:
+                raise TypeError(f"unsupported connective: {type(e).__name__}")
+        return cache[e]
+
+    return convert(expr)
+
+
+def as_formula(expr):
+    """`expr` as a native formula, converting it if it comes from sympy."""
+    return expr if isinstance(expr, Formula) else from_sympy(expr)
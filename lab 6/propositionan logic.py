@@ -1,25 +1,46 @@
-from sympy import symbols
-from sympy.logic.boolalg import And, Implies, simplify_logic
+from entailment import KnowledgeBase
+from formula import And, Implies, symbols
 
-def check_entailment(kb, query):
+def check_entailment(kb, query, method="sat"):
     """
     Checks if a knowledge base (kb) entails a query.
     
-    Entailment holds if (kb => query) is a tautology.
-    We use sympy's simplify_logic, which will return True if the
-    expression is a tautology (i.e., logically valid).
+    Entailment holds if (kb => query) is a tautology, i.e. if KB & ~query
+    has no model. That is decided by the CDCL SAT solver in cdcl.py (see
+    entailment.py), which also finds a counter-model when entailment fails.
+    The result is truthy iff the KB entails the query; its counter_model
+    holds the counter-model otherwise.
+
+    `kb` is a KnowledgeBase, or a sentence to build a throwaway one from;
+    pass the same KnowledgeBase to ask many queries against one KB.
+
+    With method="truth-table" every assignment is checked instead (see
+    truth_table.py, which needs NumPy), and the number of models of the KB
+    is reported too; practical up to about 25 symbols.
     """
+    if not isinstance(kb, KnowledgeBase):
+        kb = KnowledgeBase(kb)
     print(f"Checking if KB entails {query}...")
     # The expression for entailment is KB => Query
-    implication = Implies(kb, query)
+    implication = Implies(kb.formula(), query)
     
     print(f"  - Formulating the implication: {implication}")
     
-    # simplify_logic will return `True` if the implication is a tautology
-    result = simplify_logic(implication)
+    if method == "truth-table":
+        from truth_table import model_check
+        result = model_check(kb.formula(), query)
+        print(f"  - The KB has {result.models} model(s) over the symbols involved")
+    else:
+        # KB => Query is valid exactly when KB & ~Query is unsatisfiable
+        result = kb.ask(query)
     
-    print(f"  - Simplified result: {result}")
-    return result == True
+    if result:
+        print("  - KB & ~query has no model")
+    else:
+        model = ", ".join(f"{symbol}={value}" for symbol, value in
+                          sorted(result.counter_model.items(), key=lambda item: str(item[0])))
+        print(f"  - Counter-model: {model}")
+    return result
 
 
 # --- 1. Define Propositions ---
@@ -38,8 +59,9 @@ fact1 = P
 # Fact 3: The student completed the assignments.
 fact2 = Q
 
-# The KB is the conjunction (AND) of all its sentences
-knowledge_base = And(rule1, fact1, fact2)
+# The KB is the conjunction (AND) of all its sentences. It is converted to
+# clauses once and then answers every query below.
+knowledge_base = KnowledgeBase(rule1, fact1, fact2)
 
 print("="*40)
 print("🧠 KNOWLEDGE BASE AND QUERIES")
@@ -50,7 +72,7 @@ print(f"  Q: Student completed assignments")
 print(f"  R: Student is eligible for a certificate")
 print(f"  S: Student is on the Dean's List")
 print("-" * 20)
-print(f"Knowledge Base (KB): {knowledge_base}\n")
+print(f"Knowledge Base (KB): {knowledge_base.formula()}\n")
 
 
 # --- 3. Test an Entailed Query ---
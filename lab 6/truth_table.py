@@ -0,0 +1,175 @@
+import numpy as np
+
+from entailment import EntailmentResult
+from formula import (And, BooleanFalse, BooleanTrue, Equivalent, Implies, Not, Or, Symbol,
+                     as_formula)
+
+# Exhaustive model checking with one bit per truth assignment. With k symbols,
+# assignment m (0 <= m < 2**k) gives symbol i the value of bit i of m, and
+# assignments are packed 64 to a uint64 word: word w holds m = 64 * w + b in
+# bit b. A symbol's column of the truth table is then a fixed word pattern for
+# i < 6 and all-ones or all-zeros words (bit i - 6 of w) after that, and a
+# formula's column is computed with one bitwise NumPy operation per
+# connective over a whole chunk of words at once.
+#
+# Formulas are compiled into a straight-line program over registers, with
+# repeated subformulas computed once and registers reused once their value
+# is dead, so memory is (registers) x (chunk size) whatever the number of
+# symbols.
+
+MAX_SYMBOLS = 30
+CHUNK_WORDS = 1 << 14  # 2**20 assignments per chunk
+
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+# Word patterns of symbols 0-5: bit b of LOW_PATTERNS[i] is bit i of b
+LOW_PATTERNS = [np.uint64(sum(1 << b for b in range(64) if b >> i & 1)) for i in range(6)]
+
+
+def compile_formulas(formulas):
+    """
+    Compile formulas (see formula.py) to a register program. Returns (symbols, program,
+    outputs, registers): symbols in the order of their assignment bits,
+    instructions (op, dest, a, b), the register holding each formula's
+    column and the number of registers used.
+    """
+    symbols = sorted(set().union(*(f.free_symbols for f in formulas)), key=str)
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    values = []  # value id -> (op, a, b); a is a symbol index for "var"
+    cache = {}
+
+    def emit(op, a=None, b=None):
+        key = (op, a, b)
+        if key not in cache:
+            cache[key] = len(values)
+            values.append(key)
+        return cache[key]
+
+    def fold(op, args):
+        result = args[0]
+        for arg in args[1:]:
+            result = emit(op, result, arg)
+        return result
+
+    def node(expr):
+        if isinstance(expr, Symbol):
+            return emit("var", index[expr])
+        if isinstance(expr, BooleanTrue):
+            return emit("true")
+        if isinstance(expr, BooleanFalse):
+            return emit("false")
+        if isinstance(expr, Not):
+            return emit("not", node(expr.args[0]))
+        if isinstance(expr, And):
+            return fold("and", [node(arg) for arg in expr.args])
+        if isinstance(expr, Or):
+            return fold("or", [node(arg) for arg in expr.args])
+        if isinstance(expr, Implies):
+            return emit("implies", node(expr.args[0]), node(expr.args[1]))
+        if isinstance(expr, Equivalent):
+            args = [node(arg) for arg in expr.args]
+            return fold("and", [emit("iff", a, b) for a, b in zip(args, args[1:])])
+        raise TypeError(f"unsupported connective: {type(expr).__name__}")
+
+    outputs = [node(f) for f in formulas]
+
+    # Register allocation: a value's register is freed after its last use
+    last_use = {}
+    for i, (op, a, b) in enumerate(values):
+        if op != "var":
+            for operand in (a, b):
+                if operand is not None:
+                    last_use[operand] = i
+    pinned = set(outputs)
+    free, register = [], {}
+    program = []
+    registers = 0
+    for i, (op, a, b) in enumerate(values):
+        if free:
+            dest = free.pop()
+        else:
+            dest = registers
+            registers += 1
+        register[i] = dest
+        if op == "var":
+            program.append((op, dest, a, None))
+        else:
+            program.append((op, dest, register.get(a), register.get(b)))
+            for operand in {a, b} - {None}:
+                if last_use[operand] == i and operand not in pinned:
+                    free.append(register[operand])
+    return symbols, program, [register[v] for v in outputs], registers
+
+
+def _run(program, registers, first_word, size):
+    words = np.arange(first_word, first_word + size, dtype=np.uint64)
+    for op, dest, a, b in program:
+        out = registers[dest]
+        if op == "var":
+            if a < 6:
+                out.fill(LOW_PATTERNS[a])
+            else:
+                np.negative((words >> np.uint64(a - 6)) & np.uint64(1), out=out)
+        elif op == "not":
+            np.invert(registers[a], out=out)
+        elif op == "and":
+            np.bitwise_and(registers[a], registers[b], out=out)
+        elif op == "or":
+            np.bitwise_or(registers[a], registers[b], out=out)
+        elif op == "implies":
+            np.bitwise_or(np.invert(registers[a]), registers[b], out=out)
+        elif op == "iff":
+            np.bitwise_xor(registers[a], registers[b], out=out)
+            np.invert(out, out=out)
+        elif op == "true":
+            out.fill(ALL)
+        else:
+            out.fill(0)
+
+
+def _popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def model_check(kb, query, count=True, chunk_words=CHUNK_WORDS, max_symbols=MAX_SYMBOLS):
+    """
+    Decide whether `kb` entails `query` by enumerating every assignment to
+    their symbols. Returns an EntailmentResult whose `models` is the number
+    of models of the KB (None if count=False, which stops at the first
+    counter-model instead of finishing the table).
+    """
+    formulas = [as_formula(kb), as_formula(query)]
+    symbols, program, (kb_out, query_out), size = compile_formulas(formulas)
+    k = len(symbols)
+    if k > max_symbols:
+        raise ValueError(f"{k} symbols is too many for a truth table (max_symbols={max_symbols})")
+    total_words = max(1, (1 << k) >> 6)
+    valid = ALL if k >= 6 else np.uint64((1 << (1 << k)) - 1)
+
+    chunk_words = min(chunk_words, total_words)
+    registers = [np.empty(chunk_words, dtype=np.uint64) for _ in range(size)]
+    models = 0
+    counter_model = None
+    for first_word in range(0, total_words, chunk_words):
+        n = min(chunk_words, total_words - first_word)
+        view = [r[:n] for r in registers]
+        _run(program, view, first_word, n)
+        kb_words = view[kb_out]
+        kb_words &= valid
+        if count:
+            models += _popcount(kb_words)
+        if counter_model is None:
+            bad = kb_words & ~view[query_out]
+            hits = np.flatnonzero(bad)
+            if len(hits):
+                w = int(hits[0])
+                word = int(bad[w])
+                m = (first_word + w) * 64 + (word & -word).bit_length() - 1
+                counter_model = {symbol: bool(m >> i & 1) for i, symbol in enumerate(symbols)}
+                if not count:
+                    break
+
+    if counter_model is not None:
+        return EntailmentResult(False, counter_model, models if count else None)
+    return EntailmentResult(True, models=models if count else None)
@@ -1,13 +1,23 @@
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterator, List, Mapping, Optional, Union, Any
+
+# Substitutions are kept in triangular form: a variable is bound either to
+# another variable (union-find, with path compression) or, as the
+# representative of its class, to a term that may itself still contain bound
+# variables. Binding is O(1) and nothing is re-applied while unifying; the
+# substitution is applied to a variable only when its value is asked for, and
+# the result is cached. Unification runs on an explicit stack, and the occurs
+# check is a single cycle check over the new bindings at the end instead of a
+# term traversal per binding, so the whole thing is near-linear in the size of
+# the terms.
 
 # =========================
 # Term classes
 # =========================
 class Term:
-    def occurs(self, var: "Var", subst: Dict["Var", "Term"]) -> bool:
+    def occurs(self, var: "Var", subst: Mapping["Var", "Term"]) -> bool:
         raise NotImplementedError
 
-    def apply(self, subst: Dict["Var", "Term"]) -> "Term":
+    def apply(self, subst: Mapping["Var", "Term"]) -> "Term":
         raise NotImplementedError
 
     def __repr__(self) -> str:
@@ -20,20 +30,21 @@ class Term:
 class Var(Term):
     def __init__(self, name: str):
         self.name = name
+        self._hash = hash(("Var", name))
 
-    def occurs(self, var: "Var", subst: Dict["Var", Term]) -> bool:
+    def occurs(self, var: "Var", subst: Mapping["Var", Term]) -> bool:
         # Apply current substitution to this variable then check
         applied = self.apply(subst)
         if isinstance(applied, Var):
             return applied.name == var.name
         return applied.occurs(var, subst)
 
-    def apply(self, subst: Dict["Var", "Term"]) -> "Term":
-        # If variable in substitution dictionary, return substituted term (apply recursively)
-        for v in subst:
-            if isinstance(v, Var) and v.name == self.name:
-                return subst[v].apply(subst)
-        return self  # unchanged
+    def apply(self, subst: Mapping["Var", "Term"]) -> "Term":
+        if isinstance(subst, Substitution):
+            return subst.resolve(self)
+        # Plain dict: look the variable up and apply recursively to its value
+        term = subst.get(self)
+        return self if term is None else term.apply(subst)
 
     def __repr__(self) -> str:
         return self.name
@@ -42,17 +53,17 @@ class Var(Term):
         return isinstance(other, Var) and self.name == other.name
 
     def __hash__(self) -> int:
-        return hash(("Var", self.name))
+        return self._hash
 
 
 class Const(Term):
     def __init__(self, name: str):
         self.name = name
 
-    def occurs(self, var: "Var", subst: Dict["Var", "Term"]) -> bool:
+    def occurs(self, var: "Var", subst: Mapping["Var", "Term"]) -> bool:
         return False
 
-    def apply(self, subst: Dict["Var", "Term"]) -> "Term":
+    def apply(self, subst: Mapping["Var", "Term"]) -> "Term":
         return self
 
     def __repr__(self) -> str:
@@ -70,11 +81,13 @@ class Func(Term):
         self.name = name
         self.args = args
 
-    def occurs(self, var: "Var", subst: Dict["Var", "Term"]) -> bool:
+    def occurs(self, var: "Var", subst: Mapping["Var", "Term"]) -> bool:
         # occurs if var occurs in any argument after applying substitution
         return any(arg.apply(subst).occurs(var, subst) for arg in self.args)
 
-    def apply(self, subst: Dict["Var", "Term"]) -> "Term":
+    def apply(self, subst: Mapping["Var", "Term"]) -> "Term":
+        if isinstance(subst, Substitution):
+            return subst.resolve(self)
         applied_args = [arg.apply(subst) for arg in self.args]
         return Func(self.name, applied_args)
 
@@ -96,31 +109,247 @@ class Func(Term):
 TermLike = Union[Var, Const, Func]
 
 
+# =========================
+# Substitutions
+# =========================
+class Substitution(Mapping[Var, Term]):
+    """
+    A triangular substitution, read as a mapping Var -> Term. Looking up a
+    variable applies the substitution to its binding on demand, so s[X] is
+    the same fully substituted term a dict from the old unify() held.
+    unify() never changes a Substitution it is given; it extends a copy.
+    """
+
+    def __init__(self, bindings: Optional[Mapping[Var, Term]] = None):
+        self.parent: Dict[Var, Var] = {}   # var -> var of the same class, towards the representative
+        self.value: Dict[Var, Term] = {}   # representative -> non-variable term
+        self.bound: Dict[Var, None] = {}   # bound variables, in binding order
+        self._vars: Dict[Var, Term] = {}   # resolve() cache: representative -> term, cleared on binding
+        if bindings:
+            for var, term in bindings.items():
+                self.bind(var, term)
+            if not self._acyclic(list(self.bound)):
+                raise ValueError("substitution binds a variable to a term containing it")
+
+    def copy(self) -> "Substitution":
+        new = Substitution()
+        new.parent = dict(self.parent)
+        new.value = dict(self.value)
+        new.bound = dict(self.bound)
+        return new
+
+    def find(self, var: Var) -> Var:
+        """The representative of var's class (path halving)."""
+        parent = self.parent
+        while var in parent:
+            up = parent[var]
+            if up in parent:
+                parent[var] = up = parent[up]
+            var = up
+        return var
+
+    def bind(self, var: Var, term: TermLike) -> None:
+        """Bind var's class to term in place, without unifying or an occurs check."""
+        self._vars.clear()
+        root = self.find(var)
+        if isinstance(term, Var):
+            other = self.find(term)
+            if other == root:
+                return
+            self.parent[root] = other
+            if root in self.value:
+                self.value.setdefault(other, self.value.pop(root))
+        else:
+            self.value[root] = term
+        self.bound[root] = None
+
+    def _unify(self, x: TermLike, y: TermLike, touched: List[Var]) -> bool:
+        # In place, appending each class it binds to touched; may leave cyclic
+        # bindings, which unify() checks for afterwards
+        self._vars.clear()
+        find, value, parent, bound = self.find, self.value, self.parent, self.bound
+        funcs: Dict[int, int] = {}
+
+        def same(node):
+            key = id(node)
+            while key in funcs:
+                up = funcs[key]
+                if up in funcs:
+                    funcs[key] = up = funcs[up]
+                key = up
+            return key
+
+        stack = [(x, y)]
+        while stack:
+            a, b = stack.pop()
+            ra = rb = None
+            if isinstance(a, Var):
+                ra = find(a)
+                a = value.get(ra, ra)
+            if isinstance(b, Var):
+                rb = find(b)
+                b = value.get(rb, rb)
+            if ra is not None and rb is not None and ra == rb:
+                continue
+            if isinstance(a, Var):
+                if rb is not None:
+                    parent[a] = rb    # the class of a joins the class of b
+                else:
+                    value[a] = b      # a stands for the term b
+                bound[a] = None
+                touched.append(a)
+                continue
+            if isinstance(b, Var):
+                if ra is not None:
+                    parent[b] = ra
+                else:
+                    value[b] = a
+                bound[b] = None
+                touched.append(b)
+                continue
+            if ra is not None and rb is not None:
+                parent[ra] = rb  # both classes stand for the same term from now on
+                del value[ra]
+                touched.append(rb)
+            if isinstance(a, Func) and isinstance(b, Func):
+                # Func nodes get classes of their own (by id) while unifying: a
+                # pair met again is already unified or on the stack, which is
+                # what stops cyclic bindings from being unfolded forever
+                ka, kb = same(a), same(b)
+                if ka == kb:
+                    continue
+                funcs[ka] = kb
+                if a.name != b.name or len(a.args) != len(b.args):
+                    return False
+                stack.extend(zip(reversed(a.args), reversed(b.args)))
+            elif a != b:
+                return False
+        return True
+
+    def _acyclic(self, starts: List[Var]) -> bool:
+        # Three-colour DFS over representatives and Func nodes; a grey node
+        # reached again means some variable occurs in its own binding
+        find, value = self.find, self.value
+        colour: Dict[Any, int] = {}  # representative or id(Func) -> 1 on the path, 2 done
+        for start in starts:
+            root = find(start)
+            if root in colour or root not in value:
+                continue
+            colour[root] = 1
+            path = [(root, iter((value[root],)))]
+            while path:
+                key, children = path[-1]
+                child = next(children, None)
+                if child is None:
+                    colour[key] = 2
+                    path.pop()
+                    continue
+                if isinstance(child, Var):
+                    child = find(child)
+                    if child not in value:
+                        continue
+                    key, grandchildren = child, iter((value[child],))
+                elif isinstance(child, Func):
+                    key, grandchildren = id(child), iter(child.args)
+                else:
+                    continue
+                state = colour.get(key)
+                if state == 1:
+                    return False
+                if state is None:
+                    colour[key] = 1
+                    path.append((key, grandchildren))
+        return True
+
+    def resolve(self, term: TermLike) -> TermLike:
+        """
+        term with the substitution fully applied. Variable classes are cached
+        across calls; Func nodes only within a call, since their ids can be
+        reused once a caller's term is freed.
+        """
+        find, value, done_vars = self.find, self.value, self._vars
+        done_funcs: Dict[int, Term] = {}  # id(Func) -> term; every key is alive until we return
+        expanding = set()  # representatives whose value is being resolved
+
+        def lookup(node):
+            if isinstance(node, Var):
+                return done_vars[find(node)]
+            if isinstance(node, Func):
+                return done_funcs[id(node)]
+            return node
+
+        stack = [(term, False)]
+        while stack:
+            node, ready = stack.pop()
+            if isinstance(node, Var):
+                root = find(node)
+                if root in done_vars:
+                    continue
+                if root not in value:
+                    done_vars[root] = root
+                elif ready:
+                    done_vars[root] = lookup(value[root])
+                    expanding.discard(root)
+                elif root in expanding:
+                    # Reached again inside its own value: only possible after bind()
+                    raise ValueError(f"{root} occurs in its own binding")
+                else:
+                    expanding.add(root)
+                    stack.append((node, True))
+                    stack.append((value[root], False))
+            elif isinstance(node, Func):
+                if id(node) in done_funcs:
+                    continue
+                if ready:
+                    args = [lookup(arg) for arg in node.args]
+                    unchanged = all(new is old for new, old in zip(args, node.args))
+                    done_funcs[id(node)] = node if unchanged else Func(node.name, args)
+                else:
+                    stack.append((node, True))
+                    stack.extend((arg, False) for arg in node.args)
+        return lookup(term)
+
+    def __getitem__(self, var: Var) -> Term:
+        if var not in self.bound:
+            raise KeyError(var)
+        return self.resolve(var)
+
+    def __contains__(self, var: Any) -> bool:
+        return var in self.bound
+
+    def __iter__(self) -> Iterator[Var]:
+        return iter(self.bound)
+
+    def __len__(self) -> int:
+        return len(self.bound)
+
+    def __repr__(self) -> str:
+        return subst_to_str(self)
+
+
 # =========================
 # Utility helpers
 # =========================
-def apply_subst_to_term(subst: Dict[Var, Term], term: TermLike) -> TermLike:
+def apply_subst_to_term(subst: Mapping[Var, Term], term: TermLike) -> TermLike:
     return term.apply(subst)
 
 
-def occurs_check(var: Var, term: TermLike, subst: Dict[Var, Term]) -> bool:
+def occurs_check(var: Var, term: TermLike, subst: Mapping[Var, Term]) -> bool:
     """Return True if var occurs in term (considering current substitution)."""
     return term.apply(subst).occurs(var, subst)
 
 
-def extend_subst(subst: Dict[Var, Term], var: Var, term: TermLike) -> Dict[Var, Term]:
-    """Return a new substitution extended with var -> term, applying existing subst to term."""
-    # Ensure we copy substitution to avoid mutation surprises
-    new_subst = dict(subst)
-    new_subst[var] = term.apply(new_subst)
-    # Also apply new_subst to all existing substitution values (to keep normalized form)
-    for v in list(new_subst.keys()):
-        new_subst[v] = new_subst[v].apply(new_subst)
+def extend_subst(subst: Mapping[Var, Term], var: Var, term: TermLike) -> Substitution:
+    """Return a new substitution extended with var -> term (subst itself is unchanged)."""
+    new_subst = subst.copy() if isinstance(subst, Substitution) else Substitution(subst)
+    new_subst.bind(var, term)
+    if not new_subst._acyclic([var]):
+        raise ValueError(f"{var} occurs in {term}")
     return new_subst
 
 
 # Pretty print substitution
-def subst_to_str(subst: Optional[Dict[Var, Term]]) -> str:
+def subst_to_str(subst: Optional[Mapping[Var, Term]]) -> str:
     if subst is None:
         return "Failure (No Unifier)"
     if not subst:
@@ -132,64 +361,26 @@ def subst_to_str(subst: Optional[Dict[Var, Term]]) -> str:
 # =========================
 # The Unification Algorithm
 # =========================
-def unify(x: TermLike, y: TermLike, theta: Optional[Dict[Var, Term]] = None) -> Optional[Dict[Var, Term]]:
+def unify(x: TermLike, y: TermLike, theta: Optional[Mapping[Var, Term]] = None) -> Optional[Substitution]:
     """
-    Unify terms x and y under substitution theta.
-    Returns a substitution (dict Var->Term) or None if fails.
+    Unify terms x and y under substitution theta (a Substitution or a dict).
+    Returns the most general unifier as a Substitution, or None if there is none.
     """
-    if theta is None:
-        theta = {}
-
-    # Apply current substitution to both terms
-    x = x.apply(theta)
-    y = y.apply(theta)
-
-    # If identical after applying substitution -> success, return theta
-    if x == y:
-        return theta
-
-    # If x is variable
-    if isinstance(x, Var):
-        return unify_var(x, y, theta)
-
-    # If y is variable
-    if isinstance(y, Var):
-        return unify_var(y, x, theta)
-
-    # If both are functions, check names and arity and unify arguments pairwise
-    if isinstance(x, Func) and isinstance(y, Func):
-        if x.name != y.name or len(x.args) != len(y.args):
-            return None  # different functor or arity -> failure
-        # unify arguments left-to-right, threading the substitution
-        for a, b in zip(x.args, y.args):
-            theta = unify(a, b, theta)
-            if theta is None:
-                return None
-        return theta
-
-    # If both are constants but not equal -> fail (caught earlier by x==y)
-    return None
-
-
-def unify_var(var: Var, x: TermLike, theta: Dict[Var, Term]) -> Optional[Dict[Var, Term]]:
-    # If var already has a binding, unify its binding with x
-    for v in theta:
-        if v == var:
-            return unify(theta[v], x, theta)
-
-    # If x is variable and has binding, unify var with that binding
-    if isinstance(x, Var):
-        for v in theta:
-            if v == x:
-                return unify(var, theta[v], theta)
-
-    # Occurs check: prevent var -> ...var...
-    if occurs_check(var, x, theta):
+    if isinstance(theta, Substitution):
+        theta = theta.copy()
+    else:
+        theta = Substitution(theta)
+    touched: List[Var] = []
+    if not theta._unify(x, y, touched):
+        return None
+    # Occurs check, once: only classes bound just now can have closed a cycle
+    if not theta._acyclic(touched):
         return None
+    return theta
+
 
-    # Extend substitution
-    new_theta = extend_subst(theta, var, x)
-    return new_theta
+def unify_var(var: Var, x: TermLike, theta: Mapping[Var, Term]) -> Optional[Substitution]:
+    return unify(var, x, theta)
 
 
 # =========================
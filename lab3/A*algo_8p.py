@@ -1,22 +1,22 @@
 import heapq
 
+from sliding_puzzle import Manhattan, is_solvable, neighbor_table, pack, slide, unpack
+
 # Goal state
 goal_state = [1, 2, 3, 
               4, 5, 6, 
               7, 8, 0]
 
-# Moves for the blank tile (up, down, left, right)
-moves = {
-    0: [1, 3],          # Blank at index 0 can move right or down
-    1: [0, 2, 4],
-    2: [1, 5],
-    3: [0, 4, 6],
-    4: [1, 3, 5, 7],
-    5: [2, 4, 8],
-    6: [3, 7],
-    7: [4, 6, 8],
-    8: [5, 7]
-}
+# Moves for the blank tile (up, down, left, right): moves[i] lists the indices
+# the blank at index i can move to
+moves = neighbor_table(3)
+
+goal_code = pack(goal_state)
+
+# Goal index of every tile, so the heuristic never scans goal_state
+goal_position = [0] * 9
+for i, tile in enumerate(goal_state):
+    goal_position[tile] = i
 
 # Manhattan distance heuristic
 def manhattan_distance(state):
@@ -24,10 +24,14 @@ def manhattan_distance(state):
     for i in range(9):
         if state[i] != 0:
             x1, y1 = divmod(i, 3)  # current position
-            x2, y2 = divmod(goal_state.index(state[i]), 3)  # goal position
+            x2, y2 = divmod(goal_position[state[i]], 3)  # goal position
             distance += abs(x1 - x2) + abs(y1 - y2)
     return distance
 
+# Incremental Manhattan distance: h is carried with each node and adjusted by a
+# per-tile, per-position delta table when one tile slides
+manhattan = Manhattan(3)
+
 # Generate new states after moving blank
 def get_neighbors(state):
     neighbors = []
@@ -38,28 +42,76 @@ def get_neighbors(state):
         neighbors.append(new_state)
     return neighbors
 
-# A* search
-def a_star(start_state):
+# Walk the parent pointers back from a node and unpack the states on the way
+def rebuild_path(node, codes, parents):
+    path = []
+    while node != -1:
+        path.append(unpack(codes[node], 3))
+        node = parents[node]
+    path.reverse()
+    return path
+
+# A* search. `heuristic` takes a state list and returns a lower bound on the
+# moves left. Heuristics with an update() method (sliding_puzzle.Manhattan,
+# sliding_puzzle.LinearConflict) are updated per move from the parent's h,
+# plain functions such as manhattan_distance or a pattern_db.PatternDatabase
+# are evaluated on every neighbor. If `stats` is a dict, stats["expanded"] and
+# stats["max_heap"] are set to the nodes expanded and the largest heap size.
+def a_star(start_state, heuristic=manhattan, stats=None):
+    # Node table: node i is codes[i] (packed state), parents[i] (index of the
+    # node it was generated from, -1 for the root) and blanks[i] (blank index).
+    # Heap entries only carry (f, g, node) so nothing is copied per push.
+    if stats is not None:
+        stats["expanded"] = stats["max_heap"] = 0
+    if not is_solvable(start_state):
+        return None
+    codes = [pack(start_state)]
+    parents = [-1]
+    blanks = [start_state.index(0)]
+
     pq = []  # priority queue
-    heapq.heappush(pq, (manhattan_distance(start_state), 0, start_state, []))
+    heapq.heappush(pq, (heuristic(start_state), 0, 0))
     visited = set()
+    incremental = hasattr(heuristic, "update")
+    max_heap = 1
 
     while pq:
-        f, g, state, path = heapq.heappop(pq)
-        state_tuple = tuple(state)
+        f, g, node = heapq.heappop(pq)
+        code = codes[node]
 
-        if state == goal_state:
-            return path + [state]
+        if code == goal_code:
+            if stats is not None:
+                stats["expanded"] = len(visited)
+                stats["max_heap"] = max_heap
+            return rebuild_path(node, codes, parents)
 
-        if state_tuple in visited:
+        if code in visited:
             continue
-        visited.add(state_tuple)
+        visited.add(code)
 
-        for neighbor in get_neighbors(state):
-            if tuple(neighbor) not in visited:
+        zero_index = blanks[node]
+        for move in moves[zero_index]:
+            # Slide the tile at `move` into the blank without unpacking
+            tile = (code >> (4 * move)) & 15
+            neighbor = slide(code, zero_index, move)
+            if neighbor not in visited:
                 new_g = g + 1
-                new_f = new_g + manhattan_distance(neighbor)
-                heapq.heappush(pq, (new_f, new_g, neighbor, path + [state]))
+                if incremental:
+                    # f - g is the parent's h; the tile goes move -> zero_index
+                    board = unpack(neighbor, 3) if heuristic.uses_board else None
+                    new_h = heuristic.update(f - g, tile, move, zero_index, board)
+                else:
+                    new_h = heuristic(unpack(neighbor, 3))
+                new_f = new_g + new_h
+                codes.append(neighbor)
+                parents.append(node)
+                blanks.append(move)
+                heapq.heappush(pq, (new_f, new_g, len(codes) - 1))
+        if len(pq) > max_heap:
+            max_heap = len(pq)
+    if stats is not None:
+        stats["expanded"] = len(visited)
+        stats["max_heap"] = max_heap
     return None
 
 # Helper function to print puzzle state
@@ -0,0 +1,189 @@
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+
+import distance_table
+from pattern_db import PatternDatabase
+from sliding_puzzle import board_size, goal_state, ida_star, to_moves
+
+# Batch front end for the sliding puzzle solvers. Instances are streamed one
+# per line (n*n tiles separated by spaces or commas, 0 for the blank; blank
+# lines and lines starting with '#' are skipped) and fanned out over a process
+# pool. Every instance gets one result line:
+#
+#   <moves> <length> <nodes expanded> <seconds>
+#
+# where <moves> is the 'U'/'D'/'L'/'R' string of blank moves ("." if the
+# instance is already solved), "-" with length -1 if there is no solution, or
+# the whole line is "error: ..." for a malformed instance.
+#
+#   python batch_solve.py instances.txt --algorithm astar --workers 8
+#   cat instances.txt | python batch_solve.py - --algorithm idastar --pdb 15.pdb
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# algorithm -> (script defining it, function name); idastar and table are imported directly
+ALGORITHMS = {
+    "dfs": (os.path.join(HERE, "..", "lab 2", "8pp DFS.py"), "dfs"),
+    "ids": (os.path.join(HERE, "..", "lab 2", "8pp IDS.py"), "ids"),
+    "bfs": (os.path.join(HERE, "..", "lab 2", "8pp BFS.py"), "bidirectional_bfs"),
+    "astar": (os.path.join(HERE, "A*algo_8p.py"), "a_star"),
+}
+CHOICES = sorted([*ALGORITHMS, "idastar", "table"])
+PDB_ALGORITHMS = ("astar", "idastar")  # the ones that take a heuristic
+
+_scripts = {}   # per-process cache of loaded solver scripts
+_databases = {}  # per-process cache of memory-mapped pattern databases
+_distances = []  # per-process memory-mapped 8-puzzle distance table
+
+
+def load_script(path):
+    """Import a solver script by path (the file names are not valid module names)."""
+    if path not in _scripts:
+        name = os.path.splitext(os.path.basename(path))[0].replace(" ", "_").replace("*", "_")
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _scripts[path] = module
+    return _scripts[path]
+
+
+def load_database(path):
+    if path not in _databases:
+        _databases[path] = PatternDatabase.load(path)
+    return _databases[path]
+
+
+def parse_instance(line):
+    tiles = [int(tile) for tile in line.replace(",", " ").split()]
+    n = board_size(tiles)
+    if sorted(tiles) != list(range(n * n)):
+        raise ValueError(f"not a permutation of 0..{n * n - 1}")
+    return tiles
+
+
+def run(algorithm, tiles, pdb_path=None, stats=None):
+    """Solve one instance with the named algorithm and return its list of moves (or None)."""
+    heuristic = None
+    if pdb_path:
+        if algorithm not in PDB_ALGORITHMS:
+            raise ValueError(f"{algorithm} does not use a pattern database")
+        heuristic = load_database(pdb_path)
+        if heuristic.n * heuristic.n != len(tiles):
+            raise ValueError(f"pattern database is for the {heuristic.n}x{heuristic.n} board, "
+                             f"not {board_size(tiles)}x{board_size(tiles)}")
+    if algorithm == "idastar":
+        return ida_star(tiles, heuristic, stats=stats)
+    if len(tiles) != 9:
+        raise ValueError(f"{algorithm} only solves the 8-puzzle")
+    if algorithm == "table":
+        if not _distances:
+            prepare(algorithm)
+        if stats is not None:
+            stats["expanded"] = 0
+        return distance_table.solve(_distances[0], tiles)
+
+    path, name = ALGORITHMS[algorithm]
+    solver = getattr(load_script(path), name)
+    if algorithm == "astar":
+        if heuristic is None:
+            states = solver(tiles, stats=stats)
+        else:
+            states = solver(tiles, heuristic, stats=stats)
+        if states is None:
+            return None
+        blanks = [state.index(0) for state in states]
+        return to_moves(blanks[0], blanks[1:], 3)
+    return solver(tuple(tiles), tuple(goal_state(3)), stats=stats)
+
+
+def prepare(algorithm):
+    """
+    Load what `algorithm` needs up front (the Pool initializer), so the first
+    instance each worker solves isn't timed with the loading.
+    """
+    if algorithm == "table" and not _distances:
+        _distances.append(distance_table.load())
+    elif algorithm in ALGORITHMS:
+        load_script(ALGORITHMS[algorithm][0])
+
+
+def solve_line(algorithm, pdb_path, line):
+    try:
+        tiles = parse_instance(line)
+    except ValueError as e:
+        return f"error: {e}"
+    stats = {}
+    started = time.perf_counter()
+    try:
+        moves = run(algorithm, tiles, pdb_path, stats)
+    except (ValueError, OSError) as e:
+        return f"error: {e}"
+    elapsed = time.perf_counter() - started
+    if moves is None:
+        return f"- -1 {stats.get('expanded', 0)} {elapsed:.6f}"
+    return f"{''.join(moves) or '.'} {len(moves)} {stats.get('expanded', 0)} {elapsed:.6f}"
+
+
+def read_instances(stream):
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def solve_stream(lines, output, algorithm, workers=None, chunksize=64, pdb_path=None):
+    """Solve every instance in `lines`, writing result lines to `output` in input order."""
+    solve = partial(solve_line, algorithm, pdb_path)
+    if algorithm == "table":
+        # Build and save the table here if it is missing, so workers only map the file
+        distance_table.load()
+    if workers == 1:
+        prepare(algorithm)
+        for line in lines:
+            output.write(solve(line) + "\n")
+        return
+    with multiprocessing.Pool(workers, initializer=prepare, initargs=(algorithm,)) as pool:
+        # imap pulls instances lazily in chunks, so the input is never held in memory
+        for result in pool.imap(solve, lines, chunksize):
+            output.write(result + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve sliding puzzle instances in bulk.")
+    parser.add_argument("input", help="instance file, or - for stdin")
+    parser.add_argument("-a", "--algorithm", choices=CHOICES, default="astar")
+    parser.add_argument("-o", "--output", help="result file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU, 1 runs in-process)")
+    parser.add_argument("-c", "--chunksize", type=int, default=64,
+                        help="instances handed to a worker at a time")
+    parser.add_argument("--pdb", help="pattern database file for astar / idastar")
+    args = parser.parse_args(argv)
+    if args.pdb and args.algorithm not in PDB_ALGORITHMS:
+        parser.error(f"--pdb only applies to {' / '.join(PDB_ALGORITHMS)}")
+    if args.pdb:
+        # Fail once here rather than on every instance in every worker
+        try:
+            load_database(args.pdb)
+        except (ValueError, OSError) as e:
+            parser.error(f"--pdb: {e}")
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        solve_stream(read_instances(source), output, args.algorithm,
+                     args.workers, args.chunksize, args.pdb)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
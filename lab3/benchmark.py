@@ -0,0 +1,131 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import distance_table
+from batch_solve import run
+from sliding_puzzle import goal_state
+
+# Benchmark for the 8-puzzle solvers. Instance sets are drawn with a fixed seed
+# from the states at an exact optimal distance (looked up in the complete
+# distance table), every algorithm is run on every set, and the results go to a
+# JSON report with sorted keys so two reports can be diffed or compared:
+#
+#   python benchmark.py -o before.json
+#   python benchmark.py -o after.json --compare before.json
+
+DEPTHS = [8, 16, 24, 31]
+ALGORITHMS = ["dfs", "ids", "astar"]
+
+
+def instance_set(table, depth, count, seed):
+    """`count` states at optimal distance `depth`, the same ones for the same seed."""
+    candidates = [index for index in range(len(table)) if table[index] == depth]
+    rng = random.Random(f"{seed}-{depth}")
+    chosen = rng.sample(candidates, min(count, len(candidates)))
+    return [distance_table.unrank(index) for index in sorted(chosen)]
+
+
+def measure(algorithm, tiles, memory=True):
+    stats = {}
+    started = time.perf_counter()
+    moves = run(algorithm, tiles, stats=stats)
+    elapsed = time.perf_counter() - started
+    result = {
+        "seconds": elapsed,
+        "expanded": stats.get("expanded", 0),
+        "max_heap": stats.get("max_heap"),
+        "length": None if moves is None else len(moves),
+    }
+    if memory:
+        # A second run under tracemalloc, so tracing doesn't skew the timing
+        tracemalloc.start()
+        run(algorithm, tiles)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def summarize(results, depth):
+    solved = [r for r in results if r["length"] is not None]
+    heaps = [r["max_heap"] for r in results if r["max_heap"] is not None]
+    summary = {
+        "instances": len(results),
+        "solved": len(solved),
+        "optimal": sum(1 for r in solved if r["length"] == depth),
+        "mean_length": sum(r["length"] for r in solved) / len(solved) if solved else None,
+        "total_seconds": sum(r["seconds"] for r in results),
+        "max_seconds": max(r["seconds"] for r in results),
+        "total_expanded": sum(r["expanded"] for r in results),
+        "max_heap": max(heaps) if heaps else None,
+    }
+    if "peak_bytes" in results[0]:
+        summary["peak_bytes"] = max(r["peak_bytes"] for r in results)
+    return summary
+
+
+def benchmark(depths=DEPTHS, algorithms=ALGORITHMS, count=10, seed=0, memory=True):
+    table = distance_table.load()
+    report = {
+        "python": platform.python_version(),
+        "seed": seed,
+        "count": count,
+        "results": {},
+    }
+    for algorithm in algorithms:
+        run(algorithm, goal_state(3))  # load the solver scripts outside the timings
+    for depth in depths:
+        instances = instance_set(table, depth, count, seed)
+        for algorithm in algorithms:
+            results = [measure(algorithm, tiles, memory) for tiles in instances]
+            report["results"][f"{algorithm}/{depth}"] = summarize(results, depth)
+            print(f"{algorithm:>8} depth {depth:2}: "
+                  f"{report['results'][f'{algorithm}/{depth}']['total_seconds']:.3f}s",
+                  file=sys.stderr)
+    return report
+
+
+def compare(old, new, threshold=1.10):
+    """Print the ratio new/old of every metric, flagging increases past `threshold`."""
+    for key in sorted(new["results"]):
+        if key not in old["results"]:
+            continue
+        for metric in ("total_seconds", "total_expanded", "max_heap", "peak_bytes"):
+            before = old["results"][key].get(metric)
+            after = new["results"][key].get(metric)
+            if not before or after is None:
+                continue
+            ratio = after / before
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"{key:>12} {metric:>15}: {before:>14.6g} -> {after:>14.6g} ({ratio:.2f}x){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the 8-puzzle solvers.")
+    parser.add_argument("-d", "--depths", type=int, nargs="+", default=DEPTHS)
+    parser.add_argument("-a", "--algorithms", nargs="+", default=ALGORITHMS)
+    parser.add_argument("-n", "--count", type=int, default=10, help="instances per depth")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("-o", "--output", help="report file (default: stdout)")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    report = benchmark(args.depths, args.algorithms, args.count, args.seed, not args.no_memory)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
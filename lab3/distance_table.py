@@ -0,0 +1,115 @@
+import mmap
+import os
+import sys
+from collections import deque
+from math import factorial
+
+from sliding_puzzle import apply_move, goal_state, is_solvable, move_table
+
+# Complete distance table for the 8-puzzle. Every one of the 9! arrangements is
+# given an index by its permutation rank (Lehmer code), and a retrograde BFS
+# from the goal stores the optimal number of moves of each reachable one in a
+# byte array (255 for the unreachable half). With the table on disk and memory
+# mapped, solving an instance is just walking to a neighbor one move closer.
+
+CELLS = 9
+UNREACHABLE = 255
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "8puzzle.dist")
+
+moves = move_table(3)
+FACTORIALS = [factorial(CELLS - 1 - i) for i in range(CELLS)]
+
+
+def rank(state):
+    """Lehmer-code rank of a permutation of 0..8, in [0, 9!)."""
+    index = 0
+    for i in range(CELLS - 1):
+        tile = state[i]
+        smaller = 0
+        for j in range(i + 1, CELLS):
+            if state[j] < tile:
+                smaller += 1
+        index += smaller * FACTORIALS[i]
+    return index
+
+
+def unrank(index):
+    tiles = list(range(CELLS))
+    state = []
+    for i in range(CELLS):
+        digit, index = divmod(index, FACTORIALS[i])
+        state.append(tiles.pop(digit))
+    return state
+
+
+def build():
+    """Retrograde BFS from the goal; returns a bytearray of 9! distances."""
+    table = bytearray([UNREACHABLE]) * factorial(CELLS)
+    goal = goal_state(3)
+    table[rank(goal)] = 0
+    queue = deque([goal])
+    while queue:
+        state = queue.popleft()
+        distance = table[rank(state)] + 1
+        blank = state.index(0)
+        for _, target in moves[blank]:
+            neighbor = list(state)
+            neighbor[blank], neighbor[target] = neighbor[target], 0
+            index = rank(neighbor)
+            if table[index] == UNREACHABLE:
+                table[index] = distance
+                queue.append(neighbor)
+    return table
+
+
+def save(table, path=DEFAULT_PATH):
+    # Write then rename, so a process loading concurrently never maps half a file
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        f.write(table)
+    os.replace(partial, path)
+
+
+def load(path=DEFAULT_PATH):
+    """Memory-map a table written by save(), building and saving it first if missing."""
+    if not os.path.exists(path):
+        save(build(), path)
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def distance(table, state):
+    return table[rank(state)]
+
+
+def solve(table, start):
+    """Optimal list of moves, found by stepping to a neighbor at distance d - 1 each time."""
+    if not is_solvable(start):
+        return None
+    state = list(start)
+    remaining = table[rank(state)]
+    path = []
+    while remaining:
+        blank = state.index(0)
+        for move, target in moves[blank]:
+            state[blank], state[target] = state[target], 0
+            if table[rank(state)] == remaining - 1:
+                path.append(move)
+                remaining -= 1
+                break
+            state[target], state[blank] = state[blank], 0
+    return path
+
+
+# Example Usage
+if __name__ == "__main__":
+    table = load(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    start = (8, 6, 7,
+             2, 5, 4,
+             3, 0, 1)
+    solution = solve(table, start)
+    print("Solution found in", len(solution), "moves:", " ".join(solution))
+    state, pos = start, start.index(0)
+    for move in solution:
+        state, pos = apply_move(state, move, pos)
+    print("Final state:", state)
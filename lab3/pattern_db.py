@@ -0,0 +1,221 @@
+import mmap
+import sys
+from array import array
+
+from sliding_puzzle import neighbor_table
+
+# Disjoint additive pattern databases for the N x N sliding puzzle.
+#
+# The tiles are split into disjoint groups (a "partition"). For every group we
+# run a backward breadth-first search from the goal in which only moves of the
+# group's own tiles cost 1 (moves of the other tiles are free), and store the
+# cost for every placement of the group's tiles in a byte table. Because no
+# move is counted by two groups, the per-group costs can be added together and
+# the sum is still an admissible heuristic for A* / IDA*.
+
+# Default partitions: 4-4 for the 8-puzzle, 6-6-3 for the 15-puzzle and
+# 5-5-5-5-4 for the 24-puzzle. These are the largest groups build_table() can
+# handle in reasonable time and memory in pure Python: a 6-tile group on the
+# 4x4 board takes about 2.5 minutes and under 100 MB, a 5-tile group on the
+# 5x5 board a few minutes. The stronger 7-8 (15-puzzle) and 6-6-6-6
+# (24-puzzle) partitions have 5e8 and 1.3e8 placements per group and are out
+# of reach here.
+PARTITIONS = {
+    3: [[1, 2, 3, 4], [5, 6, 7, 8]],
+    4: [[1, 5, 6, 9, 10, 13], [7, 8, 11, 12, 14, 15], [2, 3, 4]],
+    5: [[1, 2, 3, 6, 7], [4, 5, 8, 9, 10], [11, 12, 16, 17, 21], [13, 14, 15, 18, 19],
+        [20, 22, 23, 24]],
+}
+
+MAGIC = b"PDB1"
+UNSEEN = 255
+
+
+def table_size(cells, k):
+    """Number of ways to place k distinct tiles on `cells` positions."""
+    size = 1
+    for j in range(k):
+        size *= cells - j
+    return size
+
+
+def rank(positions, cells):
+    """Index of a placement of k tiles in [0, table_size(cells, k))."""
+    index = 0
+    for j, p in enumerate(positions):
+        smaller = 0
+        for q in positions[:j]:
+            if q < p:
+                smaller += 1
+        index = index * (cells - j) + (p - smaller)
+    return index
+
+
+def build_table(n, pattern):
+    """
+    Backward breadth-first search from the goal over (pattern tile positions,
+    blank region). Returns a bytearray holding, for every placement of the
+    pattern tiles, the minimum number of pattern-tile moves needed to reach
+    the goal.
+
+    Moves of the other tiles are free, so the blank roams its whole region of
+    non-pattern cells at no cost: a state is a placement plus that region
+    (found by bitmask flood fill), and the search goes one cost layer at a
+    time. Each layer is an array('Q') of packed states. A placement is
+    packed as `where`, its tile positions read as base-`cells` digits, so
+    moving tile j from p to t just adds (t - p) * cells**j. The `visited`
+    bitmap has one bit per (where, cell) pair, so its size is cells**(k+1)
+    bits for k pattern tiles (32 MB for 6 tiles on the 4x4 board). It is set
+    for every cell of a region once the state is queued, which lets a
+    duplicate move be dropped before its region or rank is computed.
+    """
+    cells = n * n
+    k = len(pattern)
+    full = (1 << cells) - 1
+    not_first = full & ~sum(1 << (row * n) for row in range(n))        # no cell in column 0
+    not_last = full & ~sum(1 << (row * n + n - 1) for row in range(n))  # no cell in column n - 1
+    adjacent = [sum(1 << m for m in moves) for moves in neighbor_table(n)]
+    radices = [cells - j for j in range(k)]
+    powers = [cells ** j for j in range(k)]
+    span = cells ** k
+    where_bits = (span - 1).bit_length()  # the region mask sits above `where` in a packed state
+
+    table = bytearray([UNSEEN]) * table_size(cells, k)
+    visited = bytearray((span * cells + 7) // 8)
+
+    def push(positions, where, blank, occupied, cost, layer):
+        # Queue the state with the blank at `blank`, marking its whole region
+        free = full & ~occupied
+        region = 1 << blank
+        while True:
+            grown = (region | (region << n) | (region >> n)
+                     | ((region << 1) & not_first) | ((region >> 1) & not_last)) & free
+            if grown == region:
+                break
+            region = grown
+        base = where * cells
+        rest = region
+        while rest:
+            cell = rest & -rest
+            rest ^= cell
+            key = base + cell.bit_length() - 1
+            visited[key >> 3] |= 1 << (key & 7)
+        # Same ordering as rank(), with the smaller-position count taken from a bitmask
+        index = 0
+        seen = 0
+        for p, radix in zip(positions, radices):
+            index = index * radix + p - (seen & ((1 << p) - 1)).bit_count()
+            seen |= 1 << p
+        if table[index] == UNSEEN:
+            table[index] = cost  # layers come in cost order, so the first visit is the cheapest
+        layer.append(region << where_bits | where)
+
+    start = [tile - 1 for tile in pattern]  # tile t sits at t - 1 in the goal
+    layer = array("Q")
+    push(start, sum(p * w for p, w in zip(start, powers)), cells - 1,
+         sum(1 << p for p in start), 0, layer)
+    cost = 0
+    while layer:
+        cost += 1
+        following = array("Q")
+        for packed in layer:
+            where = packed & ((1 << where_bits) - 1)
+            region = packed >> where_bits
+            positions = []
+            rest = where
+            for _ in range(k):
+                rest, p = divmod(rest, cells)
+                positions.append(p)
+            occupied = sum(1 << p for p in positions)
+            # A pattern tile next to the region slides into it: one move,
+            # leaving the blank where the tile was
+            for j, p in enumerate(positions):
+                targets = adjacent[p] & region
+                if not targets:
+                    continue
+                lifted = where - p * powers[j]
+                while targets:
+                    target = targets & -targets
+                    targets ^= target
+                    t = target.bit_length() - 1
+                    moved_where = lifted + t * powers[j]
+                    key = moved_where * cells + p
+                    if visited[key >> 3] & (1 << (key & 7)):
+                        continue
+                    moved = list(positions)
+                    moved[j] = t
+                    push(moved, moved_where, p, occupied ^ (1 << p) ^ target, cost, following)
+        layer = following
+    return table
+
+
+class PatternDatabase:
+    """
+    Additive heuristic over a disjoint partition of the tiles. Instances are
+    callable on a flat state list, so they can be passed wherever a heuristic
+    function like manhattan_distance is expected.
+    """
+
+    def __init__(self, n, patterns, tables, source=None):
+        self.n = n
+        self.patterns = [list(p) for p in patterns]
+        self.tables = tables
+        self._source = source  # keeps a memory map alive while tables use it
+
+    @classmethod
+    def build(cls, n, patterns=None):
+        if patterns is None:
+            patterns = PARTITIONS[n]
+        return cls(n, patterns, [build_table(n, p) for p in patterns])
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(MAGIC + bytes([self.n, len(self.patterns)]))
+            for pattern in self.patterns:
+                f.write(bytes([len(pattern)] + pattern))
+            for table in self.tables:
+                f.write(table)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a file written by save(); tables are read lazily by the OS."""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a pattern database file")
+        n, count = data[4], data[5]
+        offset = 6
+        patterns = []
+        for _ in range(count):
+            k = data[offset]
+            patterns.append(list(data[offset + 1:offset + 1 + k]))
+            offset += 1 + k
+        view = memoryview(data)
+        tables = []
+        for pattern in patterns:
+            size = table_size(n * n, len(pattern))
+            tables.append(view[offset:offset + size])
+            offset += size
+        return cls(n, patterns, tables, source=data)
+
+    def __call__(self, state):
+        cells = self.n * self.n
+        where = [0] * cells
+        for i, tile in enumerate(state):
+            where[tile] = i
+        total = 0
+        for pattern, table in zip(self.patterns, self.tables):
+            total += table[rank([where[t] for t in pattern], cells)]
+        return total
+
+
+# Build a database and write it to disk:
+#   python pattern_db.py 4 fifteen.pdb
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python pattern_db.py <board size> <output file>")
+        sys.exit(1)
+    size = int(sys.argv[1])
+    pdb = PatternDatabase.build(size)
+    pdb.save(sys.argv[2])
+    print(f"Wrote {len(pdb.tables)} tables for the {size * size - 1}-puzzle to {sys.argv[2]}")
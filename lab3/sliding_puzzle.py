@@ -0,0 +1,310 @@
+import math
+from functools import lru_cache
+
+# Board-size-generic sliding puzzle (8-puzzle, 15-puzzle, 24-puzzle, ...).
+# A state is a flat list of n*n tiles read row by row, 0 is the blank and the
+# goal is 1, 2, ..., n*n - 1 followed by the blank.
+#
+# This is also the shared core of the lab 2 DFS / IDS solvers and the lab 3 A*
+# solver: move tables, the packed-int state encoding, move application and
+# the solvability check all live here.
+
+FOUND = -1
+
+
+def goal_state(n):
+    return list(range(1, n * n)) + [0]
+
+
+def board_size(state):
+    n = math.isqrt(len(state))
+    if n * n != len(state):
+        raise ValueError(f"a state of {len(state)} tiles is not a square board")
+    return n
+
+
+def neighbor_table(n):
+    """For every board position, the positions the blank can move to."""
+    table = []
+    for i in range(n * n):
+        row, col = divmod(i, n)
+        adjacent = []
+        if row > 0:
+            adjacent.append(i - n)
+        if row < n - 1:
+            adjacent.append(i + n)
+        if col > 0:
+            adjacent.append(i - 1)
+        if col < n - 1:
+            adjacent.append(i + 1)
+        table.append(adjacent)
+    return table
+
+
+@lru_cache(maxsize=None)
+def move_table(n):
+    """
+    For every blank position, the (move, new blank position) pairs in the
+    order 'U', 'D', 'L', 'R'. Shared between calls, so treat it as read-only.
+    """
+    letters = {-n: 'U', n: 'D', -1: 'L', 1: 'R'}
+    return [
+        [(letters[target - position], target) for target in adjacent]
+        for position, adjacent in enumerate(neighbor_table(n))
+    ]
+
+
+# Compact encoding: the tile at index i lives in bits i*b .. i*b + b - 1 of one
+# int, with b = 4 up to the 15-puzzle and 5 for the 24-puzzle
+def tile_bits(n):
+    return max(4, (n * n - 1).bit_length())
+
+
+def pack(state):
+    bits = tile_bits(board_size(state))
+    code = 0
+    for i, tile in enumerate(state):
+        code |= tile << (bits * i)
+    return code
+
+
+def unpack(code, n):
+    bits = tile_bits(n)
+    mask = (1 << bits) - 1
+    return [(code >> (bits * i)) & mask for i in range(n * n)]
+
+
+def slide(code, blank, target, bits=4):
+    """Packed state after the tile at `target` slides into the blank; no copy of the board."""
+    tile = (code >> (bits * target)) & ((1 << bits) - 1)
+    return code - (tile << (bits * target)) + (tile << (bits * blank))
+
+
+def apply_move(state, move, pos):
+    """Tuple state and blank position after moving the blank at `pos` by 'U'/'D'/'L'/'R'."""
+    n = board_size(state)
+    new_pos = pos + {'U': -n, 'D': n, 'L': -1, 'R': 1}[move]
+    new_state = list(state)
+    new_state[pos], new_state[new_pos] = new_state[new_pos], new_state[pos]
+    return tuple(new_state), new_pos
+
+
+def parity(state):
+    """
+    Invariant of every slide: the parity of the permutation taking the state to
+    the goal plus the blank's Manhattan distance from its goal corner. Counted
+    through the permutation's cycles, so it is O(n) in the number of tiles.
+    """
+    n = board_size(state)
+    cells = n * n
+    seen = [False] * cells
+    cycles = 0
+    for i in range(cells):
+        if not seen[i]:
+            cycles += 1
+            j = i
+            while not seen[j]:
+                seen[j] = True
+                tile = state[j]
+                j = tile - 1 if tile else cells - 1
+    row, col = divmod(state.index(0), n)
+    return (cells - cycles + (n - 1 - row) + (n - 1 - col)) % 2
+
+
+def is_solvable(state, goal=None):
+    """True if `goal` (the standard goal by default) can be reached from `state`."""
+    return parity(state) == (parity(goal) if goal is not None else 0)
+
+
+class Manhattan:
+    """
+    Manhattan distance heuristic for an n x n board. Calling it evaluates a
+    whole state; update() adjusts a known value after one tile slides, using a
+    precomputed per-tile, per-position delta table, so it costs O(1).
+    """
+
+    uses_board = False
+
+    def __init__(self, n):
+        self.n = n
+        cells = n * n
+        self.goal_position = [cells - 1] + list(range(cells - 1))
+        # distance[tile][position]: moves from `position` to the tile's goal
+        self.distance = [[0] * cells for _ in range(cells)]
+        for tile in range(1, cells):
+            goal_row, goal_col = divmod(self.goal_position[tile], n)
+            for position in range(cells):
+                row, col = divmod(position, n)
+                self.distance[tile][position] = abs(row - goal_row) + abs(col - goal_col)
+        # delta[tile][source][target]: change in h when `tile` slides source -> target
+        self.delta = [
+            [[to - frm for to in self.distance[tile]] for frm in self.distance[tile]]
+            for tile in range(cells)
+        ]
+
+    def __call__(self, state):
+        distance = self.distance
+        total = 0
+        for i, tile in enumerate(state):
+            total += distance[tile][i]
+        return total
+
+    def update(self, h, tile, source, target, board):
+        return h + self.delta[tile][source][target]
+
+
+class LinearConflict(Manhattan):
+    """
+    Manhattan distance plus two moves for every tile that has to leave its row
+    (or column) to let another tile in the same line pass. A slide only changes
+    the two lines the tile leaves and enters, so update() re-counts those
+    instead of the whole board.
+    """
+
+    uses_board = True
+
+    def line_conflicts(self, board, positions, axis):
+        # Tiles already in their goal line, by goal coordinate along the line;
+        # the tiles outside a longest increasing run must step out of the line.
+        n = self.n
+        line = positions[0] // n if axis == 0 else positions[0] % n
+        order = []
+        for position in positions:
+            tile = board[position]
+            if tile != 0:
+                goal_row, goal_col = divmod(self.goal_position[tile], n)
+                if (goal_row if axis == 0 else goal_col) == line:
+                    order.append(goal_col if axis == 0 else goal_row)
+        longest = [1] * len(order)
+        for i in range(len(order)):
+            for j in range(i):
+                if order[j] < order[i] and longest[j] + 1 > longest[i]:
+                    longest[i] = longest[j] + 1
+        return len(order) - max(longest, default=0)
+
+    def row(self, index):
+        return range(index * self.n, (index + 1) * self.n)
+
+    def column(self, index):
+        return range(index, self.n * self.n, self.n)
+
+    def __call__(self, state):
+        total = Manhattan.__call__(self, state)
+        for i in range(self.n):
+            total += 2 * self.line_conflicts(state, self.row(i), 0)
+            total += 2 * self.line_conflicts(state, self.column(i), 1)
+        return total
+
+    def update(self, h, tile, source, target, board):
+        # `board` already has the tile at `target`. A vertical slide changes the
+        # conflicts of two rows, a horizontal one those of two columns.
+        n = self.n
+        if source % n == target % n:
+            lines, axis = (self.row(source // n), self.row(target // n)), 0
+        else:
+            lines, axis = (self.column(source % n), self.column(target % n)), 1
+        after = sum(self.line_conflicts(board, line, axis) for line in lines)
+        board[source], board[target] = tile, 0
+        before = sum(self.line_conflicts(board, line, axis) for line in lines)
+        board[source], board[target] = 0, tile
+        return h + self.delta[tile][source][target] + 2 * (after - before)
+
+
+def to_moves(blank, positions, n):
+    """Turn the successive blank positions of a solution into 'U'/'D'/'L'/'R' moves."""
+    letters = {-n: 'U', n: 'D', -1: 'L', 1: 'R'}
+    moves = []
+    for position in positions:
+        moves.append(letters[position - blank])
+        blank = position
+    return moves
+
+
+def ida_star(start, heuristic=None, stats=None):
+    """
+    Iterative deepening A*. The search backtracks in place on a single mutable
+    board and never generates the move that undoes the previous one, so memory
+    stays at O(solution depth). Returns the list of moves or None. If `stats`
+    is a dict, stats["expanded"] is set to the number of nodes expanded.
+    """
+    n = board_size(start)
+    expanded = 0
+    if stats is not None:
+        stats["expanded"] = 0
+    if not is_solvable(start):
+        return None
+    if heuristic is None:
+        heuristic = Manhattan(n)
+    # Heuristics with an update() method are carried along incrementally,
+    # plain functions (e.g. a PatternDatabase) are re-evaluated per node
+    incremental = hasattr(heuristic, "update")
+    adjacent = neighbor_table(n)
+    goal = goal_state(n)
+    board = list(start)
+    path = []  # blank positions after each move
+
+    def search(blank, previous, g, h, bound):
+        nonlocal expanded
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and board == goal:
+            return FOUND
+        expanded += 1
+        minimum = math.inf
+        for target in adjacent[blank]:
+            if target == previous:
+                continue
+            tile = board[target]
+            board[blank], board[target] = tile, 0
+            if incremental:
+                child_h = heuristic.update(h, tile, target, blank, board)
+            else:
+                child_h = heuristic(board)
+            path.append(target)
+            t = search(target, blank, g + 1, child_h, bound)
+            if t == FOUND:
+                return FOUND
+            path.pop()
+            board[target], board[blank] = tile, 0
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    blank = board.index(0)
+    h = heuristic(board)
+    bound = h
+    while True:
+        t = search(blank, -1, 0, h, bound)
+        if stats is not None:
+            stats["expanded"] = expanded
+        if t == FOUND:
+            return to_moves(blank, path, n)
+        if t == math.inf:
+            return None
+        bound = t
+
+
+def print_board(state):
+    n = board_size(state)
+    for i in range(0, n * n, n):
+        print(" ".join(f"{tile:2}" for tile in state[i:i + n]))
+    print()
+
+
+# Example Usage
+if __name__ == "__main__":
+    start = [5, 1, 2, 4,
+             9, 6, 3, 8,
+             13, 10, 7, 11,
+             0, 14, 15, 12]
+
+    print("Initial State:")
+    print_board(start)
+
+    solution = ida_star(start)
+    if solution is None:
+        print("No solution exists!")
+    else:
+        print("Solution found in", len(solution), "moves:")
+        print(" ".join(solution))